@@ -0,0 +1,64 @@
+"""Alembic environment, running migrations against the application database."""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import Base
+import app.models.database  # noqa: F401  (registers the models on Base.metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+# A connection is passed in when the application runs the migrations at
+# startup (see app.database.init_db); it has already configured logging
+connection = config.attributes.get("connection")
+
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without a database connection."""
+    context.configure(
+        url=str(settings.DATABASE_URL),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    """Run the migrations on a synchronous connection, one transaction each."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        transaction_per_migration=True,
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """Run the migrations through the application's async driver."""
+    engine = create_async_engine(str(settings.DATABASE_URL))
+    async with engine.connect() as conn:
+        await conn.run_sync(do_run_migrations)
+        await conn.commit()
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    do_run_migrations(connection)
+else:
+    asyncio.run(run_async_migrations())
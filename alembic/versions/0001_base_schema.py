@@ -0,0 +1,147 @@
+"""Base schema
+
+Creates the application tables. Tables that already exist (databases set
+up before migrations were introduced) are left untouched. The query
+indexes are created by 0006.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Offline (--sql) runs can't inspect the database; emit the full schema
+    existing = set() if context.is_offline_mode() else set(
+        sa.inspect(op.get_bind()).get_table_names()
+    )
+    
+    if 'devices' not in existing:
+        op.create_table(
+            'devices',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('device_id', sa.String(255), nullable=False),
+            sa.Column('device_type', sa.String(50), nullable=False),
+            sa.Column('name', sa.String(255), nullable=True),
+            sa.Column('access_token', sa.Text(), nullable=False),
+            sa.Column('app_link_code', sa.String(8), nullable=True),
+            sa.Column('client_id', sa.String(100), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('device_metadata', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_devices_device_id', 'devices', ['device_id'], unique=True)
+        op.create_index('ix_devices_client_id', 'devices', ['client_id'])
+    
+    if 'api_keys' not in existing:
+        op.create_table(
+            'api_keys',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('key', sa.String(64), nullable=False),
+            sa.Column('name', sa.String(255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('permissions', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('last_used', sa.DateTime(), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_api_keys_key', 'api_keys', ['key'], unique=True)
+    
+    if 'sensor_readings' not in existing:
+        # Primary key includes the hypertable partitioning columns, see 0002
+        op.create_table(
+            'sensor_readings',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('time', sa.DateTime(), nullable=False),
+            sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('sensor_type', sa.String(50), nullable=False),
+            sa.Column('sensor_name', sa.String(255), nullable=True),
+            sa.Column('raw_value', sa.Float(), nullable=True),
+            sa.Column('value', sa.Text(), nullable=True),
+            sa.Column('formatted_value', sa.Text(), nullable=True),
+            sa.Column('unit', sa.String(50), nullable=True),
+            sa.ForeignKeyConstraint(['device_id'], ['devices.id']),
+            sa.PrimaryKeyConstraint('id', 'time', 'device_id'),
+        )
+    
+    if 'latest_sensor_readings' not in existing:
+        op.create_table(
+            'latest_sensor_readings',
+            sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('sensor_type', sa.String(50), nullable=False),
+            sa.Column('time', sa.DateTime(), nullable=False),
+            sa.Column('sensor_name', sa.String(255), nullable=True),
+            sa.Column('raw_value', sa.Float(), nullable=True),
+            sa.Column('value', sa.Text(), nullable=True),
+            sa.Column('formatted_value', sa.Text(), nullable=True),
+            sa.Column('unit', sa.String(50), nullable=True),
+            sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('device_id', 'sensor_type'),
+        )
+    
+    if 'alarms' not in existing:
+        op.create_table(
+            'alarms',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('sensor_type', sa.String(50), nullable=False),
+            sa.Column('name', sa.String(255), nullable=False),
+            sa.Column('condition', sa.String(20), nullable=False),
+            sa.Column('threshold_min', sa.Float(), nullable=True),
+            sa.Column('threshold_max', sa.Float(), nullable=True),
+            sa.Column('enabled', sa.Boolean(), nullable=True),
+            sa.Column('webhook_url', sa.Text(), nullable=True),
+            sa.Column('email', sa.String(255), nullable=True),
+            sa.Column('cooldown_minutes', sa.Integer(), nullable=True),
+            sa.Column('last_triggered', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['device_id'], ['devices.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    
+    if 'alarm_history' not in existing:
+        # Primary key includes the hypertable partitioning column, see 0004
+        op.create_table(
+            'alarm_history',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('alarm_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('device_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('sensor_type', sa.String(50), nullable=False),
+            sa.Column('sensor_name', sa.String(255), nullable=True),
+            sa.Column('sensor_value', sa.Float(), nullable=False),
+            sa.Column('formatted_value', sa.String(255), nullable=True),
+            sa.Column('condition_met', sa.String(50), nullable=False),
+            sa.Column('triggered_at', sa.DateTime(), nullable=False),
+            sa.Column('notification_sent', sa.Boolean(), nullable=True),
+            sa.Column('notification_types', sa.JSON(), nullable=True),
+            sa.Column('notification_results', sa.JSON(), nullable=True),
+            sa.Column('notification_errors', sa.JSON(), nullable=True),
+            sa.ForeignKeyConstraint(['alarm_id'], ['alarms.id']),
+            sa.ForeignKeyConstraint(['device_id'], ['devices.id']),
+            sa.PrimaryKeyConstraint('id', 'triggered_at'),
+        )
+        op.create_index('idx_alarm_device_time', 'alarm_history',
+                        ['alarm_id', 'device_id', 'triggered_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('alarm_history')
+    op.drop_table('alarms')
+    op.drop_table('latest_sensor_readings')
+    op.drop_table('sensor_readings')
+    op.drop_table('api_keys')
+    op.drop_table('devices')
@@ -0,0 +1,84 @@
+"""sensor_readings hypertable
+
+Turns sensor_readings into a TimescaleDB hypertable with 1-day chunks,
+space partitioning on device_id and compression of chunks older than
+7 days.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS timescaledb")
+    
+    # Hypertable unique constraints must include every partitioning column;
+    # tables created before the models changed still have PRIMARY KEY (id)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF (SELECT array_agg(a.attname::text ORDER BY a.attname::text)
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = 'sensor_readings'::regclass AND i.indisprimary)
+               IS DISTINCT FROM ARRAY['device_id', 'id', 'time']::text[] THEN
+                ALTER TABLE sensor_readings
+                    DROP CONSTRAINT IF EXISTS sensor_readings_pkey,
+                    ADD PRIMARY KEY (id, time, device_id);
+            END IF;
+        END $$
+    """)
+    
+    # 1-day chunks so time range filters prune to the few chunks they cover
+    op.execute(
+        "SELECT create_hypertable('sensor_readings', 'time', "
+        "chunk_time_interval => INTERVAL '1 day', "
+        "if_not_exists => TRUE, migrate_data => TRUE)"
+    )
+    # Hypertables created before the interval was set keep it for new chunks
+    op.execute("SELECT set_chunk_time_interval('sensor_readings', INTERVAL '1 day')")
+    
+    # Space partitioning so per-device queries prune to one partition;
+    # TimescaleDB only allows adding it while the hypertable is empty
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM sensor_readings LIMIT 1) THEN
+                PERFORM add_dimension('sensor_readings', 'device_id',
+                                      number_partitions => 16, if_not_exists => TRUE);
+            END IF;
+        END $$
+    """)
+    
+    # Columnar compression for aged chunks, segmented to match the
+    # device_id / sensor_type filters of the history and export queries
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT (SELECT compression_enabled FROM timescaledb_information.hypertables
+                    WHERE hypertable_name = 'sensor_readings') THEN
+                ALTER TABLE sensor_readings SET (
+                    timescaledb.compress,
+                    timescaledb.compress_segmentby = 'device_id, sensor_type',
+                    timescaledb.compress_orderby = 'time DESC'
+                );
+            END IF;
+        END $$
+    """)
+    op.execute(
+        "SELECT add_compression_policy('sensor_readings', INTERVAL '7 days', "
+        "if_not_exists => TRUE)"
+    )
+
+
+def downgrade() -> None:
+    # A hypertable can't be turned back into a plain table; only stop compressing
+    op.execute("SELECT remove_compression_policy('sensor_readings', if_exists => TRUE)")
@@ -0,0 +1,56 @@
+"""Sensor history continuous aggregates
+
+Real-time continuous aggregates backing the history endpoint, one per
+aggregation (see SENSOR_AGGREGATES in app.models.database), so the
+not yet materialized tail is still served from raw rows.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# (view name, bucket width, refresh window) as of this revision
+AGGREGATES = (
+    ("sensor_readings_1min", "1 minute", "1 hour"),
+    ("sensor_readings_5min", "5 minutes", "6 hours"),
+    ("sensor_readings_15min", "15 minutes", "1 day"),
+    ("sensor_readings_1hour", "1 hour", "7 days"),
+    ("sensor_readings_1day", "1 day", "30 days"),
+)
+
+
+def upgrade() -> None:
+    for view, bucket, window in AGGREGATES:
+        op.execute(f"""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+            WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+            SELECT time_bucket(INTERVAL '{bucket}', time) AS bucket,
+                   device_id,
+                   sensor_type,
+                   sensor_name,
+                   avg(raw_value) AS value,
+                   max(formatted_value) AS formatted_value,
+                   max(unit) AS unit
+            FROM sensor_readings
+            GROUP BY bucket, device_id, sensor_type, sensor_name
+            WITH NO DATA
+        """)
+        op.execute(
+            f"SELECT add_continuous_aggregate_policy('{view}', "
+            f"start_offset => INTERVAL '{window}', "
+            f"end_offset => INTERVAL '{bucket}', "
+            f"schedule_interval => INTERVAL '{bucket}', "
+            f"if_not_exists => TRUE)"
+        )
+
+
+def downgrade() -> None:
+    for view, _, _ in AGGREGATES:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view} CASCADE")
@@ -0,0 +1,69 @@
+"""alarm_history hypertable
+
+Turns alarm_history into a TimescaleDB hypertable on triggered_at with
+30-day chunks. Chunks are deliberately left uncompressed: deleting an
+alarm or device cascades DELETEs into alarm_history, which older
+TimescaleDB releases reject on compressed chunks.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # triggered_at joins the primary key, as hypertable unique constraints
+    # must include the partitioning column
+    op.execute(
+        "UPDATE alarm_history SET triggered_at = timezone('UTC', now()) "
+        "WHERE triggered_at IS NULL"
+    )
+    op.execute("ALTER TABLE alarm_history ALTER COLUMN triggered_at SET NOT NULL")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF (SELECT array_agg(a.attname::text ORDER BY a.attname::text)
+                FROM pg_index i
+                JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                WHERE i.indrelid = 'alarm_history'::regclass AND i.indisprimary)
+               IS DISTINCT FROM ARRAY['id', 'triggered_at']::text[] THEN
+                ALTER TABLE alarm_history
+                    DROP CONSTRAINT IF EXISTS alarm_history_pkey,
+                    ADD PRIMARY KEY (id, triggered_at);
+            END IF;
+        END $$
+    """)
+    
+    # Alarm history is far sparser than readings, so it gets wider chunks
+    op.execute(
+        "SELECT create_hypertable('alarm_history', 'triggered_at', "
+        "chunk_time_interval => INTERVAL '30 days', "
+        "if_not_exists => TRUE, migrate_data => TRUE)"
+    )
+    
+    # Undo compression enabled by the former startup DDL
+    op.execute("SELECT remove_compression_policy('alarm_history', if_exists => TRUE)")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF (SELECT compression_enabled FROM timescaledb_information.hypertables
+                WHERE hypertable_name = 'alarm_history') THEN
+                PERFORM decompress_chunk(c, if_compressed => TRUE)
+                FROM show_chunks('alarm_history') c;
+                ALTER TABLE alarm_history SET (timescaledb.compress = false);
+            END IF;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    # A hypertable can't be turned back into a plain table, and the primary
+    # key has to keep triggered_at for as long as it is one
+    pass
@@ -0,0 +1,43 @@
+"""latest_sensor_readings backfill
+
+Seeds latest_sensor_readings from the existing readings. The table is
+kept current by the readings writer, which upserts the newest value of
+each sensor once per batch; the per-row trigger previously installed
+by the startup DDL is removed.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_latest_sensor_reading ON sensor_readings")
+    op.execute("DROP FUNCTION IF EXISTS upsert_latest_sensor_reading()")
+    op.execute("""
+        INSERT INTO latest_sensor_readings AS l
+            (device_id, sensor_type, time, sensor_name, raw_value, value, formatted_value, unit)
+        SELECT DISTINCT ON (device_id, sensor_type)
+            device_id, sensor_type, time, sensor_name, raw_value, value, formatted_value, unit
+        FROM sensor_readings
+        ORDER BY device_id, sensor_type, time DESC
+        ON CONFLICT (device_id, sensor_type) DO UPDATE SET
+            time = EXCLUDED.time,
+            sensor_name = EXCLUDED.sensor_name,
+            raw_value = EXCLUDED.raw_value,
+            value = EXCLUDED.value,
+            formatted_value = EXCLUDED.formatted_value,
+            unit = EXCLUDED.unit
+        WHERE l.time < EXCLUDED.time
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM latest_sensor_readings")
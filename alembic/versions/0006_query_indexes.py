@@ -0,0 +1,68 @@
+"""Query indexes
+
+Brings databases created before the query indexes were added to the
+models in line with them, and drops the indexes they superseded. The
+models only reach fresh databases: create_all skips existing tables.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # sensor_readings: the covering composite serves the device / sensor_type /
+    # time filters, the BRIN the plain time ranges
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_sr_dev_type_time
+        ON sensor_readings (device_id, sensor_type, time DESC)
+        INCLUDE (sensor_name, value, formatted_value, unit)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_sr_time_brin
+        ON sensor_readings USING brin (time) WITH (pages_per_range = 32)
+    """)
+    op.execute("DROP INDEX IF EXISTS idx_device_sensor_time")
+    op.execute("DROP INDEX IF EXISTS ix_sensor_readings_time")
+    op.execute("DROP INDEX IF EXISTS ix_sensor_readings_sensor_type")
+    
+    # alarm_history: keyset pagination by alarm or device walks these backwards;
+    # triggered_at on its own is covered by the primary key
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_alarm_history_alarm_triggered
+        ON alarm_history (alarm_id, triggered_at, id)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_alarm_history_device_triggered
+        ON alarm_history (device_id, triggered_at, id) INCLUDE (sensor_type)
+    """)
+    op.execute("DROP INDEX IF EXISTS ix_alarm_history_triggered_at")
+    
+    # alarms: partial index for the enabled-alarm lookups of the alarm check
+    # and the in-memory alarm index
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_alarms_active_device_sensor
+        ON alarms (device_id, sensor_type) WHERE enabled = TRUE
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_alarms_active_device_sensor")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_alarm_history_triggered_at ON alarm_history (triggered_at)")
+    op.execute("DROP INDEX IF EXISTS ix_alarm_history_device_triggered")
+    op.execute("DROP INDEX IF EXISTS ix_alarm_history_alarm_triggered")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sensor_readings_sensor_type ON sensor_readings (sensor_type)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sensor_readings_time ON sensor_readings (time)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_device_sensor_time "
+        "ON sensor_readings (device_id, sensor_type, time)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_sr_time_brin")
+    op.execute("DROP INDEX IF EXISTS ix_sr_dev_type_time")
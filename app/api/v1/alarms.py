@@ -1,24 +1,86 @@
 """Alarm management endpoints."""
 
+import base64
+import binascii
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from sqlalchemy import select, and_
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select, update, and_, exists, tuple_
 from sqlalchemy.orm import selectinload
 
+from app.database import async_session_maker
 from app.dependencies import CurrentApiKey, DatabaseSession, get_device_manager
 from app.models.database import Device, Alarm, AlarmHistory
 from app.models.schemas import (
     AlarmCreate, AlarmUpdate, AlarmResponse, AlarmHistoryResponse, ErrorResponse
 )
-from app.services.alarm_service import AlarmService
 from app.services.redis_service import redis_service
-from app.core.const import get_sensor_types_for_device
+from app.core.const import get_sensor_type_keys, get_sensor_name_unit
 
 router = APIRouter()
 
+# Compiled once; validates whole result pages in a single call
+_alarm_list_adapter = TypeAdapter(List[AlarmResponse])
+_alarm_history_list_adapter = TypeAdapter(List[AlarmHistoryResponse])
+
+# AlarmHistory columns needed to build an AlarmHistoryResponse
+_HISTORY_COLUMNS = (
+    AlarmHistory.id,
+    AlarmHistory.alarm_id,
+    AlarmHistory.device_id,
+    AlarmHistory.sensor_type,
+    AlarmHistory.sensor_name,
+    AlarmHistory.sensor_value,
+    AlarmHistory.formatted_value,
+    AlarmHistory.condition_met,
+    AlarmHistory.triggered_at,
+    AlarmHistory.notification_sent,
+    AlarmHistory.notification_types,
+    AlarmHistory.notification_results,
+)
+
+
+def _test_out_of_range_desc(sensor_name: str, formatted_value: str, alarm: Alarm) -> str:
+    return f"TEST: {sensor_name} {formatted_value} outside range [{alarm.threshold_min}, {alarm.threshold_max}]"
+
+
+# Test condition descriptions by alarm condition (out_of_range is the default)
+_TEST_CONDITION_DESC = {
+    "above": lambda s, v, a: f"TEST: {s} {v} > {a.threshold_max} (above threshold)",
+    "below": lambda s, v, a: f"TEST: {s} {v} < {a.threshold_min} (below threshold)",
+    "equals": lambda s, v, a: f"TEST: {s} {v} = {a.threshold_min} (equals threshold)",
+    "out_of_range": _test_out_of_range_desc,
+}
+
+
+def _encode_cursor(triggered_at: datetime, history_id: UUID) -> str:
+    """Encode the last row of a history page as an opaque cursor."""
+    raw = f"{triggered_at.isoformat()}|{history_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a history cursor into its (triggered_at, id) position."""
+    try:
+        triggered_at, history_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(triggered_at), UUID(history_id)
+    except (ValueError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _set_next_cursor(response: Response, records: List[Any], limit: int):
+    """Expose the cursor for the next page when the current one is full."""
+    if records and len(records) == limit:
+        last = records[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.triggered_at, last.id)
+
 
 @router.post(
     "/devices/{device_id}/alarms",
@@ -34,23 +96,28 @@ async def create_alarm(
     device_id: UUID,
     alarm_data: AlarmCreate,
     session: DatabaseSession,
-    api_key: CurrentApiKey
+    api_key: CurrentApiKey,
+    device_manager = Depends(get_device_manager)
 ):
     """Create a new alarm for a device."""
-    # Verify device exists
-    device = await session.get(Device, device_id)
-    if not device:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Device not found"
-        )
+    # Device type never changes, so a cache hit skips the device lookup
+    device_type = await redis_service.get_device_type(str(device_id))
+    if device_type is None:
+        # Verify device exists
+        device = await session.get(Device, device_id)
+        if not device:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Device not found"
+            )
+        device_type = device.device_type
+        await redis_service.cache_device_type(str(device_id), device_type)
     
     # Verify sensor type is valid for device
-    sensor_types = get_sensor_types_for_device(device.device_type)
-    if alarm_data.sensor_type not in sensor_types:
+    if alarm_data.sensor_type not in get_sensor_type_keys(device_type):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid sensor type '{alarm_data.sensor_type}' for device type '{device.device_type}'"
+            detail=f"Invalid sensor type '{alarm_data.sensor_type}' for device type '{device_type}'"
         )
     
     # Create alarm
@@ -69,10 +136,10 @@ async def create_alarm(
     
     session.add(alarm)
     await session.commit()
-    await session.refresh(alarm)
     
     # Invalidate cache
     await redis_service.invalidate_device_alarms(str(device_id))
+    await device_manager.refresh_alarm_index(device_id)
     
     return AlarmResponse.from_orm(alarm)
 
@@ -87,31 +154,48 @@ async def create_alarm(
 )
 async def list_device_alarms(
     device_id: UUID,
-    session: DatabaseSession,
     api_key: CurrentApiKey,
     enabled_only: bool = Query(False, description="Only return enabled alarms")
 ):
     """List all alarms for a device."""
-    # Verify device exists
-    device = await session.get(Device, device_id)
-    if not device:
+    async def _load_from_db() -> Optional[List[Dict[str, Any]]]:
+        # Uses its own session so it can also run as a background refresh
+        async with async_session_maker() as db:
+            # Verify device exists
+            device = await db.get(Device, device_id)
+            if not device:
+                return None
+            
+            # Query alarms
+            query = select(Alarm).where(Alarm.device_id == device_id)
+            
+            if enabled_only:
+                query = query.where(Alarm.enabled == True)
+            
+            query = query.order_by(Alarm.created_at.desc())
+            
+            result = await db.execute(query)
+            alarms = _alarm_list_adapter.dump_python(
+                _alarm_list_adapter.validate_python(result.scalars().all(), from_attributes=True),
+                mode="json"
+            )
+            
+            return alarms
+    
+    alarms = await redis_service.get_or_set_swr(
+        f"alarms:device:{device_id}:enabled={enabled_only}",
+        _load_from_db,
+        ttl=300
+    )
+    
+    if alarms is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found"
         )
     
-    # Query alarms
-    query = select(Alarm).where(Alarm.device_id == device_id)
-    
-    if enabled_only:
-        query = query.where(Alarm.enabled == True)
-    
-    query = query.order_by(Alarm.created_at.desc())
-    
-    result = await session.execute(query)
-    alarms = result.scalars().all()
-    
-    return [AlarmResponse.from_orm(alarm) for alarm in alarms]
+    # Already validated and JSON-ready, skip response_model re-validation
+    return ORJSONResponse(alarms)
 
 
 @router.get(
@@ -151,10 +235,23 @@ async def update_alarm(
     alarm_id: UUID,
     alarm_update: AlarmUpdate,
     session: DatabaseSession,
-    api_key: CurrentApiKey
+    api_key: CurrentApiKey,
+    device_manager = Depends(get_device_manager)
 ):
     """Update an alarm."""
-    alarm = await session.get(Alarm, alarm_id)
+    update_data = alarm_update.model_dump(exclude_unset=True)
+    
+    if update_data:
+        # Update and fetch the row back in one round-trip
+        result = await session.execute(
+            update(Alarm)
+            .where(Alarm.id == alarm_id)
+            .values(**update_data)
+            .returning(Alarm)
+        )
+        alarm = result.scalar_one_or_none()
+    else:
+        alarm = await session.get(Alarm, alarm_id)
     
     if not alarm:
         raise HTTPException(
@@ -162,16 +259,11 @@ async def update_alarm(
             detail="Alarm not found"
         )
     
-    # Update fields
-    update_data = alarm_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(alarm, field, value)
-    
     await session.commit()
-    await session.refresh(alarm)
     
     # Invalidate cache
     await redis_service.invalidate_device_alarms(str(alarm.device_id))
+    await device_manager.refresh_alarm_index(alarm.device_id)
     
     return AlarmResponse.from_orm(alarm)
 
@@ -187,7 +279,8 @@ async def update_alarm(
 async def delete_alarm(
     alarm_id: UUID,
     session: DatabaseSession,
-    api_key: CurrentApiKey
+    api_key: CurrentApiKey,
+    device_manager = Depends(get_device_manager)
 ):
     """Delete an alarm."""
     alarm = await session.get(Alarm, alarm_id)
@@ -205,6 +298,7 @@ async def delete_alarm(
     
     # Invalidate cache
     await redis_service.invalidate_device_alarms(str(device_id))
+    await device_manager.refresh_alarm_index(device_id)
 
 
 @router.get(
@@ -217,39 +311,60 @@ async def delete_alarm(
 )
 async def get_alarm_history(
     alarm_id: UUID,
+    response: Response,
     session: DatabaseSession,
     api_key: CurrentApiKey,
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     limit: int = Query(100, le=1000)
 ):
-    """Get alarm trigger history."""
-    # Verify alarm exists
-    alarm = await session.get(Alarm, alarm_id)
-    if not alarm:
+    """
+    Get alarm trigger history.
+    
+    Results are paginated newest first; pass the X-Next-Cursor header value
+    as ``cursor`` to fetch the next page.
+    """
+    # Fetch history with alarm and device names joined in
+    query = (
+        select(
+            *_HISTORY_COLUMNS,
+            Alarm.name.label("alarm_name"),
+            Device.name.label("device_name")
+        )
+        .outerjoin(Alarm, Alarm.id == AlarmHistory.alarm_id)
+        .outerjoin(Device, Device.id == AlarmHistory.device_id)
+        .where(AlarmHistory.alarm_id == alarm_id)
+    )
+    
+    if start_time:
+        query = query.where(AlarmHistory.triggered_at >= start_time)
+    if end_time:
+        query = query.where(AlarmHistory.triggered_at <= end_time)
+    if cursor:
+        query = query.where(
+            tuple_(AlarmHistory.triggered_at, AlarmHistory.id) < _decode_cursor(cursor)
+        )
+    
+    query = query.order_by(
+        AlarmHistory.triggered_at.desc(),
+        AlarmHistory.id.desc()
+    ).limit(limit)
+    
+    result = await session.execute(query)
+    rows = result.all()
+    
+    # Only verify the alarm exists when there is nothing to return
+    if not rows and not await session.scalar(select(exists().where(Alarm.id == alarm_id))):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alarm not found"
         )
     
-    # Get history
-    history = await AlarmService.get_alarm_history(
-        alarm_id=alarm_id,
-        start_time=start_time,
-        end_time=end_time,
-        limit=limit
-    )
-    
-    # Format response
-    response = []
-    for record in history:
-        item = AlarmHistoryResponse.from_orm(record)
-        item.alarm_name = alarm.name
-        if hasattr(record, 'device') and record.device:
-            item.device_name = record.device.name
-        response.append(item)
+    _set_next_cursor(response, rows, limit)
     
-    return response
+    # Format response in a single validation pass
+    return _alarm_history_list_adapter.validate_python([row._mapping for row in rows])
 
 
 @router.get(
@@ -262,14 +377,21 @@ async def get_alarm_history(
 )
 async def get_device_alarm_history(
     device_id: UUID,
+    response: Response,
     session: DatabaseSession,
     api_key: CurrentApiKey,
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
     sensor_type: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     limit: int = Query(100, le=1000)
 ):
-    """Get all alarm history for a device."""
+    """
+    Get all alarm history for a device.
+    
+    Results are paginated newest first; pass the X-Next-Cursor header value
+    as ``cursor`` to fetch the next page.
+    """
     # Verify device exists
     device = await session.get(Device, device_id)
     if not device:
@@ -278,8 +400,12 @@ async def get_device_alarm_history(
             detail="Device not found"
         )
     
-    # Build query
-    query = select(AlarmHistory).where(AlarmHistory.device_id == device_id)
+    # Build query, selecting exactly the response columns (alarm name joined in)
+    query = (
+        select(*_HISTORY_COLUMNS, Alarm.name.label("alarm_name"))
+        .join(Alarm, Alarm.id == AlarmHistory.alarm_id)
+        .where(AlarmHistory.device_id == device_id)
+    )
     
     if sensor_type:
         query = query.where(AlarmHistory.sensor_type == sensor_type)
@@ -287,31 +413,24 @@ async def get_device_alarm_history(
         query = query.where(AlarmHistory.triggered_at >= start_time)
     if end_time:
         query = query.where(AlarmHistory.triggered_at <= end_time)
+    if cursor:
+        query = query.where(
+            tuple_(AlarmHistory.triggered_at, AlarmHistory.id) < _decode_cursor(cursor)
+        )
     
-    query = query.order_by(AlarmHistory.triggered_at.desc()).limit(limit)
+    query = query.order_by(
+        AlarmHistory.triggered_at.desc(),
+        AlarmHistory.id.desc()
+    ).limit(limit)
     
     result = await session.execute(query)
-    history = result.scalars().all()
-    
-    # Get alarm names
-    alarm_ids = list(set(record.alarm_id for record in history))
-    if alarm_ids:
-        alarms_result = await session.execute(
-            select(Alarm).where(Alarm.id.in_(alarm_ids))
-        )
-        alarms = {alarm.id: alarm.name for alarm in alarms_result.scalars().all()}
-    else:
-        alarms = {}
-    
-    # Format response
-    response = []
-    for record in history:
-        item = AlarmHistoryResponse.from_orm(record)
-        item.alarm_name = alarms.get(record.alarm_id)
-        item.device_name = device.name
-        response.append(item)
+    rows = result.all()
+    _set_next_cursor(response, rows, limit)
     
-    return response
+    # Format response in a single validation pass
+    return _alarm_history_list_adapter.validate_python(
+        [{**row._mapping, "device_name": device.name} for row in rows]
+    )
 
 
 @router.post(
@@ -343,23 +462,15 @@ async def test_alarm(
         )
     
     # Get sensor info
-    sensor_types = get_sensor_types_for_device(alarm.device.device_type)
-    sensor_config = sensor_types.get(alarm.sensor_type, {})
-    sensor_name = sensor_config.get('name', alarm.sensor_type)
-    unit = sensor_config.get('unit_of_measurement', '')
+    sensor_name, unit = get_sensor_name_unit(alarm.device.device_type, alarm.sensor_type)
     
     # Format test value
     formatted_value = f"{test_value} {unit}".strip()
     
     # Create test condition description
-    if alarm.condition == "above":
-        condition_desc = f"TEST: {sensor_name} {formatted_value} > {alarm.threshold_max} (above threshold)"
-    elif alarm.condition == "below":
-        condition_desc = f"TEST: {sensor_name} {formatted_value} < {alarm.threshold_min} (below threshold)"
-    elif alarm.condition == "equals":
-        condition_desc = f"TEST: {sensor_name} {formatted_value} = {alarm.threshold_min} (equals threshold)"
-    else:  # out_of_range
-        condition_desc = f"TEST: {sensor_name} {formatted_value} outside range [{alarm.threshold_min}, {alarm.threshold_max}]"
+    condition_desc = _TEST_CONDITION_DESC.get(alarm.condition, _test_out_of_range_desc)(
+        sensor_name, formatted_value, alarm
+    )
     
     # Send test notifications
     sensor_data = {
@@ -1,5 +1,6 @@
 """Authentication endpoints."""
 
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -35,7 +36,7 @@ async def create_api_key(
     # Check if master key protection is enabled
     from app.config import settings
     if settings.MASTER_API_KEY:
-        if not master_key or master_key != settings.MASTER_API_KEY:
+        if not master_key or not hmac.compare_digest(master_key.encode(), settings.MASTER_API_KEY.encode()):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or missing master API key"
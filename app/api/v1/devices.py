@@ -4,18 +4,25 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status, Depends, Request
-from sqlalchemy import select
+from pydantic import TypeAdapter
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import raiseload
 
-from app.dependencies import CurrentApiKey, DatabaseSession, get_device_manager
-from app.models.database import Device
+from app.dependencies import CurrentApiKey, DatabaseSession, get_device_manager, get_bayrol_http
+from app.models.database import Device, Alarm
 from app.models.schemas import (
     DeviceCreate, DeviceUpdate, DeviceResponse, 
     DeviceDetailResponse, ErrorResponse
 )
 from app.services.auth_service import BayrolAuthService
+from app.services.redis_service import redis_service
 
 router = APIRouter()
 
+# Compiled once; validates the whole device listing in a single call
+_device_detail_list_adapter = TypeAdapter(List[DeviceDetailResponse])
+
 
 @router.post(
     "/",
@@ -31,7 +38,8 @@ async def create_device(
     device_data: DeviceCreate,
     session: DatabaseSession,
     api_key: CurrentApiKey,
-    device_manager = Depends(get_device_manager)
+    device_manager = Depends(get_device_manager),
+    bayrol_http = Depends(get_bayrol_http)
 ):
     """
     Add a new Bayrol device using the app link code.
@@ -40,34 +48,35 @@ async def create_device(
     """
     try:
         # Get device credentials from Bayrol API
-        credentials = await BayrolAuthService.get_device_credentials(device_data.app_link_code)
+        credentials = await BayrolAuthService.get_device_credentials(
+            device_data.app_link_code, bayrol_http
+        )
         
-        # Check if device already exists
-        result = await session.execute(
-            select(Device).where(Device.device_id == credentials["device_serial"])
+        # Create device in database; an existing device_id inserts nothing
+        stmt = (
+            pg_insert(Device)
+            .values(
+                device_id=credentials["device_serial"],
+                device_type=device_data.device_type,
+                name=device_data.name or f"{device_data.device_type} - {credentials['device_serial'][-4:]}",
+                access_token=credentials["access_token"],
+                app_link_code=device_data.app_link_code,
+                client_id=device_data.client_id,
+                device_metadata=credentials.get("raw_response", {})
+            )
+            .on_conflict_do_nothing(index_elements=[Device.device_id])
+            .returning(Device)
         )
-        existing_device = result.scalar_one_or_none()
+        result = await session.execute(stmt)
+        device = result.scalar_one_or_none()
         
-        if existing_device:
+        if device is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Device {credentials['device_serial']} already exists"
             )
         
-        # Create device in database
-        device = Device(
-            device_id=credentials["device_serial"],
-            device_type=device_data.device_type,
-            name=device_data.name or f"{device_data.device_type} - {credentials['device_serial'][-4:]}",
-            access_token=credentials["access_token"],
-            app_link_code=device_data.app_link_code,
-            client_id=device_data.client_id,
-            device_metadata=credentials.get("raw_response", {})
-        )
-        
-        session.add(device)
         await session.commit()
-        await session.refresh(device)
         
         # Add device to device manager
         success = await device_manager.add_device(
@@ -89,6 +98,8 @@ async def create_device(
         
         return DeviceResponse.from_orm(device)
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -117,7 +128,21 @@ async def list_devices(
     client_id: Optional[str] = None
 ):
     """List all devices, optionally filtered by client_id."""
-    query = select(Device)
+    # Count active alarms per device in SQL instead of loading alarm rows
+    active_cnt = (
+        select(
+            Alarm.device_id,
+            func.count().filter(Alarm.enabled == True).label("cnt")
+        )
+        .group_by(Alarm.device_id)
+        .subquery()
+    )
+    
+    query = (
+        select(Device, active_cnt.c.cnt)
+        .outerjoin(active_cnt, active_cnt.c.device_id == Device.id)
+        .options(raiseload("*"))
+    )
     
     # Filter by client_id if provided
     if client_id:
@@ -129,31 +154,26 @@ async def list_devices(
         .limit(limit)
         .order_by(Device.created_at.desc())
     )
-    devices = result.scalars().all()
     
     # Enhance with connection status from device manager
-    response = []
-    for device in devices:
+    rows = []
+    for device, cnt in result.all():
         device_info = device_manager.get_device(device.id)
         
-        detail = DeviceDetailResponse(
-            id=device.id,
-            device_id=device.device_id,
-            device_type=device.device_type,
-            name=device.name,
-            is_active=device.is_active,
-            created_at=device.created_at,
-            updated_at=device.updated_at,
-            is_connected=device_info['is_connected'] if device_info else False,
-            last_seen=device_info['last_seen'] if device_info else None
-        )
-        
-        # Count active alarms
-        detail.active_alarms = len([a for a in device.alarms if a.enabled])
-        
-        response.append(detail)
+        rows.append({
+            'id': device.id,
+            'device_id': device.device_id,
+            'device_type': device.device_type,
+            'name': device.name,
+            'is_active': device.is_active,
+            'created_at': device.created_at,
+            'updated_at': device.updated_at,
+            'is_connected': device_info['is_connected'] if device_info else False,
+            'last_seen': device_info['last_seen'] if device_info else None,
+            'active_alarms': cnt or 0
+        })
     
-    return response
+    return _device_detail_list_adapter.validate_python(rows)
 
 
 @router.get(
@@ -171,17 +191,29 @@ async def get_device(
     device_manager = Depends(get_device_manager)
 ):
     """Get device details."""
+    # Count active alarms alongside the device instead of loading alarm rows
+    count_sq = (
+        select(func.count())
+        .select_from(Alarm)
+        .where(Alarm.device_id == Device.id, Alarm.enabled == True)
+        .correlate(Device)
+        .scalar_subquery()
+    )
     result = await session.execute(
-        select(Device).where(Device.id == device_id)
+        select(Device, count_sq.label("active_alarms"))
+        .options(raiseload("*"))
+        .where(Device.id == device_id)
     )
-    device = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not device:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found"
         )
     
+    device, active_alarms = row
+    
     # Get connection status from device manager
     device_info = device_manager.get_device(device.id)
     
@@ -195,7 +227,7 @@ async def get_device(
         updated_at=device.updated_at,
         is_connected=device_info['is_connected'] if device_info else False,
         last_seen=device_info['last_seen'] if device_info else None,
-        active_alarms=len([a for a in device.alarms if a.enabled])
+        active_alarms=active_alarms
     )
     
     return detail
@@ -217,9 +249,20 @@ async def update_device(
     device_manager = Depends(get_device_manager)
 ):
     """Update device information."""
-    result = await session.execute(
-        select(Device).where(Device.id == device_id)
-    )
+    update_data = device_update.model_dump(exclude_unset=True)
+    
+    if update_data:
+        # Update and fetch the row back in one round-trip
+        result = await session.execute(
+            update(Device)
+            .where(Device.id == device_id)
+            .values(**update_data)
+            .returning(Device)
+        )
+    else:
+        result = await session.execute(
+            select(Device).where(Device.id == device_id)
+        )
     device = result.scalar_one_or_none()
     
     if not device:
@@ -228,11 +271,6 @@ async def update_device(
             detail="Device not found"
         )
     
-    # Update fields
-    update_data = device_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(device, field, value)
-    
     # Handle activation/deactivation
     if "is_active" in update_data:
         if update_data["is_active"] and device.id not in device_manager.devices:
@@ -249,7 +287,10 @@ async def update_device(
             await device_manager.remove_device(device.id)
     
     await session.commit()
-    await session.refresh(device)
+    
+    # Invalidate cache
+    await redis_service.invalidate_device_meta(str(device_id))
+    await redis_service.invalidate_current_sensors(str(device_id))
     
     return DeviceResponse.from_orm(device)
 
@@ -286,4 +327,11 @@ async def delete_device(
     
     # Delete from database (cascade will handle related records)
     await session.delete(device)
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+    await device_manager.refresh_alarm_index(device_id)
+    
+    # Invalidate cache
+    await redis_service.invalidate_device_type(str(device_id))
+    await redis_service.invalidate_device_meta(str(device_id))
+    await redis_service.invalidate_current_sensors(str(device_id))
+    await redis_service.invalidate_device_alarms(str(device_id))
\ No newline at end of file
@@ -1,23 +1,101 @@
 """Sensor data endpoints."""
 
+import asyncio
+import re
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from sqlalchemy import select, and_, func
+import orjson
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Select, select, and_, any_, bindparam, func, literal_column, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.expression import ColumnElement, FromClause
 from sqlalchemy.orm import selectinload
 
+from app.database import async_session_maker
 from app.dependencies import CurrentApiKey, DatabaseSession, get_device_manager
-from app.models.database import Device, SensorReading
+from app.models.database import SensorReading, LatestSensorReading, SENSOR_AGGREGATE_VIEWS
 from app.models.schemas import (
-    SensorCurrentResponse, SensorHistoryQuery, SensorHistoryResponse,
+    SensorCurrentResponse, SensorHistoryResponse,
     SensorReading as SensorReadingSchema, ErrorResponse
 )
+from app.services.device_service import DeviceService
+from app.services.redis_service import redis_service
 from app.core.sensor_handler import get_mqtt_value_for_select
 
 router = APIRouter()
 
+# Rows fetched per round-trip when streaming history and exports
+_HISTORY_PARTITION = 500
+_EXPORT_PARTITION = 1000
+
+_CSV_HEADER = b"timestamp,sensor_type,sensor_name,value,unit,formatted_value\r\n"
+_CSV_NEEDS_QUOTING = re.compile(r'[",\r\n]')
+
+
+def _reading_filters(
+    source: FromClause,
+    time_column: ColumnElement,
+    device_id: UUID,
+    sensor_types: Optional[List[str]],
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+    default_window: str
+) -> List[ColumnElement]:
+    """
+    Build the WHERE clauses shared by the history and export queries.
+    
+    Sensor types are bound as a single array parameter, so the statement text
+    (and its cached plan) doesn't change with the number of requested types.
+    Without a start_time the window is computed in SQL (``default_window``
+    back from now, UTC), keeping the default query free of a per-call timestamp.
+    """
+    filters = [source.c.device_id == device_id]
+    if start_time:
+        filters.append(time_column >= start_time)
+    else:
+        filters.append(
+            time_column >= func.timezone('UTC', func.now()) - literal_column(f"INTERVAL '{default_window}'")
+        )
+    if sensor_types:
+        filters.append(source.c.sensor_type == any_(
+            bindparam('sensor_types', sensor_types, type_=ARRAY(String))
+        ))
+    if end_time:
+        filters.append(time_column <= end_time)
+    return filters
+
+
+async def _fetch_latest_readings(device_id: UUID) -> List[LatestSensorReading]:
+    """Get the latest reading of each sensor type, on a session of its own."""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(LatestSensorReading).where(LatestSensorReading.device_id == device_id)
+        )
+        return result.scalars().all()
+
+
+async def _fetch_history_rows(query: Select) -> List[Dict[str, Any]]:
+    """Run a history query through a server-side cursor, on a session of its own."""
+    async with async_session_maker() as session:
+        result = await session.stream(query.execution_options(yield_per=_HISTORY_PARTITION))
+        
+        data = []
+        async for partition in result.partitions():
+            data.extend(dict(row._mapping) for row in partition)
+        return data
+
+
+def _csv_field(value: Optional[str]) -> bytes:
+    """Encode a CSV field, quoting it only when it contains special characters."""
+    if not value:
+        return b""
+    if _CSV_NEEDS_QUOTING.search(value):
+        value = '"' + value.replace('"', '""') + '"'
+    return value.encode()
+
 
 @router.get(
     "/{device_id}/current",
@@ -29,16 +107,38 @@ router = APIRouter()
 )
 async def get_current_sensors(
     device_id: UUID,
+    request: Request,
     session: DatabaseSession,
     api_key: CurrentApiKey,
     device_manager = Depends(get_device_manager)
 ):
     """Get current sensor values for a device."""
-    # Verify device exists
-    result = await session.execute(
-        select(Device).where(Device.id == device_id)
-    )
-    device = result.scalar_one_or_none()
+    if_none_match = request.headers.get("if-none-match")
+    
+    # Serve the snapshot cached since the last MQTT update
+    cached = await redis_service.get_current_sensors(str(device_id))
+    if cached:
+        etag, body = cached
+        if if_none_match == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    
+    # Read before computing, so an MQTT update during the lookups below
+    # keeps this response out of the cache
+    generation = await redis_service.get_current_sensors_generation(str(device_id))
+    
+    # Get current values from device manager
+    current_sensors = device_manager.get_device_sensors(device_id)
+    
+    if current_sensors:
+        device = await DeviceService.get_device_meta(session, device_id)
+    else:
+        # Device might not be connected, verify it exists while fetching
+        # the latest reading of each sensor type from DB
+        device, readings = await asyncio.gather(
+            DeviceService.get_device_meta(session, device_id),
+            _fetch_latest_readings(device_id)
+        )
     
     if not device:
         raise HTTPException(
@@ -46,33 +146,15 @@ async def get_current_sensors(
             detail="Device not found"
         )
     
-    # Get current values from device manager
-    current_sensors = device_manager.get_device_sensors(device_id)
-    
     if not current_sensors:
-        # Device might not be connected, try to get latest from DB
-        result = await session.execute(
-            select(SensorReading)
-            .where(SensorReading.device_id == device_id)
-            .order_by(SensorReading.time.desc())
-            .limit(100)  # Get last 100 readings to cover all sensor types
-        )
-        readings = result.scalars().all()
-        
-        # Group by sensor type to get latest of each
-        latest_by_type = {}
-        for reading in readings:
-            if reading.sensor_type not in latest_by_type:
-                latest_by_type[reading.sensor_type] = reading
-        
         # Convert to response format
         sensors = {}
         last_update = None
         
-        for sensor_type, reading in latest_by_type.items():
-            sensors[sensor_type] = SensorReadingSchema(
+        for reading in readings:
+            sensors[reading.sensor_type] = SensorReadingSchema.model_construct(
                 sensor_type=reading.sensor_type,
-                sensor_name=reading.sensor_name or sensor_type,
+                sensor_name=reading.sensor_name or reading.sensor_type,
                 value=reading.value,
                 formatted_value=reading.formatted_value or str(reading.value),
                 unit=reading.unit,
@@ -83,10 +165,10 @@ async def get_current_sensors(
     else:
         # Convert current values to response format
         sensors = {}
-        last_update = datetime.utcnow()
+        last_update = None
         
         for sensor_type, sensor_data in current_sensors.items():
-            sensors[sensor_type] = SensorReadingSchema(
+            sensors[sensor_type] = SensorReadingSchema.model_construct(
                 sensor_type=sensor_type,
                 sensor_name=sensor_data['sensor_name'],
                 value=sensor_data['value'],
@@ -94,13 +176,24 @@ async def get_current_sensors(
                 unit=sensor_data.get('unit'),
                 timestamp=sensor_data['timestamp']
             )
+            if not last_update or sensor_data['timestamp'] > last_update:
+                last_update = sensor_data['timestamp']
     
-    return SensorCurrentResponse(
+    last_update = last_update or datetime.utcnow()
+    etag = f'W/"{int(last_update.timestamp() * 1000)}"'
+    
+    # Data is already typed (DB rows / device manager state), skip validation
+    body = SensorCurrentResponse.model_construct(
         device_id=device_id,
-        device_name=device.name,
-        last_update=last_update or datetime.utcnow(),
+        device_name=device["name"],
+        last_update=last_update,
         sensors=sensors
-    )
+    ).model_dump_json()
+    await redis_service.cache_current_sensors(str(device_id), etag, body, generation)
+    
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.get(
@@ -122,11 +215,36 @@ async def get_sensor_history(
     aggregation: Optional[str] = Query("raw", regex="^(raw|1min|5min|15min|1hour|1day)$")
 ):
     """Get historical sensor data for a device."""
-    # Verify device exists
-    result = await session.execute(
-        select(Device).where(Device.id == device_id)
+    # Raw rows come from the hypertable, aggregates from the matching
+    # pre-materialized continuous aggregate
+    if aggregation == "raw":
+        source = SensorReading.__table__
+        time_column = source.c.time
+    else:
+        source = SENSOR_AGGREGATE_VIEWS[aggregation]
+        time_column = source.c.bucket
+    
+    # Build query
+    query = select(
+        time_column.label('time'),
+        source.c.sensor_type,
+        source.c.sensor_name,
+        source.c.value,
+        source.c.formatted_value,
+        source.c.unit
+    ).where(*_reading_filters(
+        source, time_column, device_id, sensor_types, start_time, end_time,
+        default_window="1 day"  # Default to last 24 hours
+    ))
+    
+    # Order and limit
+    query = query.order_by(time_column.desc()).limit(limit)
+    
+    # Verify device exists while the readings are fetched
+    device, data = await asyncio.gather(
+        DeviceService.get_device_meta(session, device_id),
+        _fetch_history_rows(query)
     )
-    device = result.scalar_one_or_none()
     
     if not device:
         raise HTTPException(
@@ -134,102 +252,56 @@ async def get_sensor_history(
             detail="Device not found"
         )
     
-    # Build query
-    query = select(SensorReading).where(SensorReading.device_id == device_id)
-    
-    # Apply filters
-    if sensor_types:
-        query = query.where(SensorReading.sensor_type.in_(sensor_types))
+    # Rows are already typed by the database, serialize without model validation
+    return ORJSONResponse({
+        "device_id": device_id,
+        "query": {
+            "sensor_types": sensor_types,
+            "start_time": start_time or datetime.utcnow() - timedelta(days=1),
+            "end_time": end_time,
+            "limit": limit,
+            "aggregation": aggregation
+        },
+        "data": data
+    })
+
+
+def _validate_select_value(device_info: Dict[str, Any], sensor_type: str, value: str):
+    """Raise an HTTPException unless value is valid for the device's select sensor."""
+    sensor_config = device_info['sensor_configs'].get(sensor_type)
+    if not sensor_config:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Sensor {sensor_type} not found for this device"
+        )
     
-    if start_time:
-        query = query.where(SensorReading.time >= start_time)
-    else:
-        # Default to last 24 hours
-        start_time = datetime.utcnow() - timedelta(days=1)
-        query = query.where(SensorReading.time >= start_time)
+    if sensor_config.entity_type != 'select':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Sensor {sensor_type} is not a select entity"
+        )
     
-    if end_time:
-        query = query.where(SensorReading.time <= end_time)
-    
-    # Apply aggregation if requested
-    if aggregation != "raw":
-        # Use PostgreSQL time_bucket for aggregation
-        interval_map = {
-            "1min": "1 minute",
-            "5min": "5 minutes",
-            "15min": "15 minutes",
-            "1hour": "1 hour",
-            "1day": "1 day"
-        }
-        interval = interval_map[aggregation]
-        
-        # Aggregate query using time_bucket
-        query = (
-            select(
-                func.time_bucket(interval, SensorReading.time).label('time'),
-                SensorReading.sensor_type,
-                SensorReading.sensor_name,
-                func.avg(SensorReading.value).label('value'),
-                func.max(SensorReading.formatted_value).label('formatted_value'),
-                func.max(SensorReading.unit).label('unit')
+    # Validate value is in options
+    options = sensor_config.options
+    if options:
+        # Convert value to the options' type
+        try:
+            typed_value = sensor_config.options_parser(value)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid value type. Expected {type(options[0]).__name__}"
             )
-            .where(SensorReading.device_id == device_id)
-            .group_by('time', SensorReading.sensor_type, SensorReading.sensor_name)
-        )
         
-        if sensor_types:
-            query = query.where(SensorReading.sensor_type.in_(sensor_types))
-        if start_time:
-            query = query.where(SensorReading.time >= start_time)
-        if end_time:
-            query = query.where(SensorReading.time <= end_time)
-    
-    # Order and limit
-    query = query.order_by(SensorReading.time.desc()).limit(limit)
-    
-    # Execute query
-    result = await session.execute(query)
-    readings = result.all()
-    
-    # Format response
-    data = []
-    for reading in readings:
-        if aggregation != "raw":
-            # Aggregated data
-            data.append({
-                "time": reading.time,
-                "sensor_type": reading.sensor_type,
-                "sensor_name": reading.sensor_name,
-                "value": float(reading.value) if reading.value is not None else None,
-                "formatted_value": reading.formatted_value,
-                "unit": reading.unit
-            })
-        else:
-            # Raw data
-            data.append({
-                "time": reading.time,
-                "sensor_type": reading.sensor_type,
-                "sensor_name": reading.sensor_name,
-                "value": reading.value,
-                "formatted_value": reading.formatted_value,
-                "unit": reading.unit
-            })
-    
-    return SensorHistoryResponse(
-        device_id=device_id,
-        query=SensorHistoryQuery(
-            sensor_types=sensor_types,
-            start_time=start_time,
-            end_time=end_time,
-            limit=limit,
-            aggregation=aggregation
-        ),
-        data=data
-    )
+        if typed_value not in sensor_config.options_set:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid value. Must be one of: {list(options)}"
+            )
 
 
 @router.put(
-    "/{device_id}/select/{sensor_type}",
+    "/{device_id}/select",
     status_code=status.HTTP_204_NO_CONTENT,
     responses={
         401: {"model": ErrorResponse, "description": "Unauthorized"},
@@ -237,20 +309,16 @@ async def get_sensor_history(
         400: {"model": ErrorResponse, "description": "Invalid value or sensor type"}
     }
 )
-async def update_select_sensor(
+async def update_select_sensors(
     device_id: UUID,
-    sensor_type: str,
-    value: str,
+    values: Dict[str, str],
     session: DatabaseSession,
     api_key: CurrentApiKey,
     device_manager = Depends(get_device_manager)
 ):
-    """Update a select sensor value (e.g., pH target, production mode)."""
+    """Update several select sensors at once (sensor type -> value), published in one burst."""
     # Verify device exists
-    result = await session.execute(
-        select(Device).where(Device.id == device_id)
-    )
-    device = result.scalar_one_or_none()
+    device = await DeviceService.get_device_meta(session, device_id)
     
     if not device:
         raise HTTPException(
@@ -266,40 +334,58 @@ async def update_select_sensor(
             detail="Device is not connected"
         )
     
-    # Verify this is a select sensor
-    sensor_config = device_info['sensor_configs'].get(sensor_type)
-    if not sensor_config:
+    # Validate everything before sending anything
+    for sensor_type, value in values.items():
+        _validate_select_value(device_info, sensor_type, value)
+    
+    # Send values to device
+    results = await device_manager.send_select_values(device_id, values)
+    
+    failed = [sensor_type for sensor_type, success in results.items() if not success]
+    if failed:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update sensor values: {failed}"
+        )
+
+
+@router.put(
+    "/{device_id}/select/{sensor_type}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        404: {"model": ErrorResponse, "description": "Device or sensor not found"},
+        400: {"model": ErrorResponse, "description": "Invalid value or sensor type"}
+    }
+)
+async def update_select_sensor(
+    device_id: UUID,
+    sensor_type: str,
+    value: str,
+    session: DatabaseSession,
+    api_key: CurrentApiKey,
+    device_manager = Depends(get_device_manager)
+):
+    """Update a select sensor value (e.g., pH target, production mode)."""
+    # Verify device exists
+    device = await DeviceService.get_device_meta(session, device_id)
+    
+    if not device:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Sensor {sensor_type} not found for this device"
+            detail="Device not found"
         )
     
-    if sensor_config.get('entity_type') != 'select':
+    # Check if device is connected
+    device_info = device_manager.get_device(device_id)
+    if not device_info or not device_info['is_connected']:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Sensor {sensor_type} is not a select entity"
+            detail="Device is not connected"
         )
     
-    # Validate value is in options
-    options = sensor_config.get('options', [])
-    if options:
-        # Convert value to appropriate type
-        try:
-            if isinstance(options[0], (int, float)):
-                typed_value = float(value)
-            else:
-                typed_value = value
-                
-            if typed_value not in options:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid value. Must be one of: {options}"
-                )
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid value type. Expected {type(options[0]).__name__}"
-            )
+    # Verify this is a select sensor and the value is one of its options
+    _validate_select_value(device_info, sensor_type, value)
     
     # Send value to device
     success = await device_manager.send_select_value(device_id, sensor_type, value)
@@ -329,15 +415,9 @@ async def export_sensor_data(
 ):
     """Export sensor data in CSV or JSON format."""
     from fastapi.responses import StreamingResponse
-    import csv
-    import io
-    import json
     
     # Verify device exists
-    result = await session.execute(
-        select(Device).where(Device.id == device_id)
-    )
-    device = result.scalar_one_or_none()
+    device = await DeviceService.get_device_meta(session, device_id)
     
     if not device:
         raise HTTPException(
@@ -345,72 +425,82 @@ async def export_sensor_data(
             detail="Device not found"
         )
     
-    # Build query
-    query = select(SensorReading).where(SensorReading.device_id == device_id)
-    
-    if sensor_types:
-        query = query.where(SensorReading.sensor_type.in_(sensor_types))
-    
-    if start_time:
-        query = query.where(SensorReading.time >= start_time)
-    else:
-        start_time = datetime.utcnow() - timedelta(days=7)  # Default to last week
-        query = query.where(SensorReading.time >= start_time)
+    # Build query, selecting only the exported columns
+    source = SensorReading.__table__
+    query = select(
+        source.c.time,
+        source.c.sensor_type,
+        source.c.sensor_name,
+        source.c.value,
+        source.c.unit,
+        source.c.formatted_value
+    ).where(*_reading_filters(
+        source, source.c.time, device_id, sensor_types, start_time, end_time,
+        default_window="7 days"  # Default to last week
+    ))
     
-    if end_time:
-        query = query.where(SensorReading.time <= end_time)
+    query = query.order_by(SensorReading.time.asc()).execution_options(
+        yield_per=_EXPORT_PARTITION
+    )
     
-    query = query.order_by(SensorReading.time.asc())
+    async def stream_partitions():
+        # Own session: the response body is produced after the endpoint returns
+        async with async_session_maker() as stream_session:
+            result = await stream_session.stream(query)
+            async for partition in result.partitions():
+                yield partition
     
-    # Execute query
-    result = await session.execute(query)
-    readings = result.scalars().all()
+    filename = f"bayrol_{device['device_id']}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
     
     if format == "csv":
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow(['timestamp', 'sensor_type', 'sensor_name', 'value', 'unit', 'formatted_value'])
-        
-        # Data
-        for reading in readings:
-            writer.writerow([
-                reading.time.isoformat(),
-                reading.sensor_type,
-                reading.sensor_name or '',
-                reading.value,
-                reading.unit or '',
-                reading.formatted_value or ''
-            ])
-        
-        output.seek(0)
+        async def generate_csv():
+            yield _CSV_HEADER
+            
+            # Data, one chunk per fetched partition
+            async for partition in stream_partitions():
+                yield b"".join([
+                    b"%s,%s,%s,%s,%s,%s\r\n" % (
+                        reading.time.isoformat().encode(),
+                        reading.sensor_type.encode(),
+                        _csv_field(reading.sensor_name),
+                        _csv_field(reading.value),
+                        _csv_field(reading.unit),
+                        _csv_field(reading.formatted_value)
+                    )
+                    for reading in partition
+                ])
         
         return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
+            generate_csv(),
             media_type="text/csv",
             headers={
-                "Content-Disposition": f"attachment; filename=bayrol_{device.device_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+                "Content-Disposition": f"attachment; filename={filename}.csv"
             }
         )
     
     else:  # JSON
-        data = []
-        for reading in readings:
-            data.append({
-                "timestamp": reading.time.isoformat(),
-                "sensor_type": reading.sensor_type,
-                "sensor_name": reading.sensor_name,
-                "value": reading.value,
-                "unit": reading.unit,
-                "formatted_value": reading.formatted_value
-            })
+        async def generate_json():
+            separator = b"["
+            async for partition in stream_partitions():
+                chunk = []
+                for reading in partition:
+                    chunk.append(separator)
+                    chunk.append(orjson.dumps({
+                        "timestamp": reading.time,
+                        "sensor_type": reading.sensor_type,
+                        "sensor_name": reading.sensor_name,
+                        "value": reading.value,
+                        "unit": reading.unit,
+                        "formatted_value": reading.formatted_value
+                    }))
+                    separator = b","
+                yield b"".join(chunk)
+            yield b"]" if separator == b"," else b"[]"
         
         return StreamingResponse(
-            io.BytesIO(json.dumps(data, indent=2).encode()),
+            generate_json(),
             media_type="application/json",
             headers={
-                "Content-Disposition": f"attachment; filename=bayrol_{device.device_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+                "Content-Disposition": f"attachment; filename={filename}.json"
             }
-        )
\ No newline at end of file
+        )
@@ -2,11 +2,13 @@
 
 from uuid import UUID
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from sqlalchemy import select
 
 from app.database import async_session_maker
-from app.models.database import Device, ApiKey
+from app.models.database import ApiKey
+from app.services.device_service import DeviceService
 from app.dependencies import get_device_manager
 import logging
 from datetime import datetime
@@ -41,10 +43,7 @@ async def websocket_endpoint(
             return
         
         # Verify device exists
-        result = await session.execute(
-            select(Device).where(Device.id == device_id)
-        )
-        device = result.scalar_one_or_none()
+        device = await DeviceService.get_device_meta(session, device_id)
         
         if not device:
             await websocket.close(code=4004, reason="Device not found")
@@ -52,6 +51,7 @@ async def websocket_endpoint(
     
     # Accept connection
     await websocket.accept()
+    device_manager = get_device_manager(websocket)
     
     # Register WebSocket with device manager
     device_manager.register_websocket(device_id, websocket)
@@ -71,20 +71,22 @@ async def websocket_endpoint(
         # Send current sensor values
         current_sensors = device_manager.get_device_sensors(device_id)
         if current_sensors:
-            await websocket.send_json({
+            # orjson handles the datetime timestamps; the live view is
+            # snapshotted into a dict for encoding
+            await websocket.send_text(orjson.dumps({
                 "type": "sensor_update",
                 "device_id": str(device_id),
                 "timestamp": datetime.utcnow().isoformat(),
                 "data": {
-                    "sensors": current_sensors
+                    "sensors": dict(current_sensors)
                 }
-            })
+            }).decode())
         
-        # Keep connection alive
-        while True:
-            # Wait for any message from client (ping/pong)
-            data = await websocket.receive_text()
-            # Could implement commands here in the future
+        # Keepalive is handled by protocol-level pings (uvicorn --ws-ping-interval),
+        # so just wait for the client to go away; client frames are ignored
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        logger.info(f"WebSocket disconnected for device {device_id}")
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for device {device_id}")
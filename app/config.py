@@ -1,6 +1,6 @@
 """Application configuration."""
 
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, RedisDsn
 
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: PostgresDsn
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # asyncpg statements cached per connection
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 512  # SQLAlchemy prepared statements per connection
     
     # Redis
     REDIS_URL: RedisDsn
@@ -29,10 +34,17 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str
     MASTER_API_KEY: Optional[str] = None
+
+    # CORS - JSON list of allowed origins, e.g. ["https://pool.example.com"]
+    CORS_ORIGINS: List[str] = ["*"]
+    # Seconds browsers may cache a preflight response
+    CORS_MAX_AGE: int = 600
     
     # Notifications
     ALARM_WEBHOOK_URL: Optional[str] = None
     EMAIL_WEBHOOK_URL: Optional[str] = None
+    # Alarm history rows drained from the Redis queue per insert batch
+    ALARM_HISTORY_BATCH_SIZE: int = 1000
     
     # Logging
     LOG_LEVEL: str = "INFO"
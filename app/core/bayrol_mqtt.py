@@ -3,16 +3,23 @@
 from __future__ import annotations
 
 import logging
-import threading
-import paho.mqtt.client as paho
+import ssl
+import aiomqtt
 import json
-from typing import Dict, Callable, Optional, Any
+import orjson
+from typing import Dict, Callable, Iterable, Optional, Any, Tuple
 import asyncio
 
 from app.config import settings
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to wait before reconnecting after the broker connection drops
+RECONNECT_INTERVAL = 5
+
+# One TLS context (and CA store) shared by every device connection
+_SHARED_SSL_CTX = ssl.create_default_context()
+
 
 class BayrolMQTTManager:
     """Manage the Bayrol MQTT connection."""
@@ -22,121 +29,125 @@ class BayrolMQTTManager:
         self.mqtt_user = mqtt_user
         self.device_id = device_id
         self.callback_handler = callback_handler
-        self.client = None
-        self.thread = None
-        self._subscribers: Dict[str, Callable] = {}
-        self._loop = asyncio.get_event_loop()
+        self.client: Optional[aiomqtt.Client] = None
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: Dict[str, Optional[Callable]] = {}
+        self._connected = False
 
-    def subscribe(self, topic: str, callback: Callable):
-        """Subscribe to a topic with a callback."""
+    async def subscribe(self, topic: str, callback: Optional[Callable] = None):
+        """Subscribe to a topic, optionally with a direct callback."""
         self._subscribers[topic] = callback
-        if self.client and self.client.is_connected():
-            self.client.subscribe(f"d02/{self.device_id}/v/{topic}")
+        if self.is_connected():
+            await self.client.subscribe(f"d02/{self.device_id}/v/{topic}")
             # Push to receive initial value
-            self.client.publish(f"d02/{self.device_id}/g/{topic}")
+            await self.client.publish(f"d02/{self.device_id}/g/{topic}")
 
-    def unsubscribe(self, topic: str):
+    async def unsubscribe(self, topic: str):
         """Unsubscribe from a topic."""
         if topic in self._subscribers:
             del self._subscribers[topic]
-            if self.client and self.client.is_connected():
-                self.client.unsubscribe(f"d02/{self.device_id}/v/{topic}")
+            if self.is_connected():
+                await self.client.unsubscribe(f"d02/{self.device_id}/v/{topic}")
 
-    def publish(self, topic: str, value: Any):
+    async def publish(self, topic: str, value: Any):
         """Publish a value to a topic."""
-        if self.client and self.client.is_connected():
+        if self.is_connected():
             payload = json.dumps({"v": value})
-            self.client.publish(f"d02/{self.device_id}/s/{topic}", payload)
+            await self.client.publish(f"d02/{self.device_id}/s/{topic}", payload)
 
-    def _on_connect(self, client, userdata, flags, rc):
+    async def publish_many(self, items: Iterable[Tuple[str, Any]]):
+        """Publish several (topic, value) pairs back-to-back without waiting on each."""
+        if self.is_connected():
+            await asyncio.gather(*(
+                self.client.publish(f"d02/{self.device_id}/s/{topic}", json.dumps({"v": value}))
+                for topic, value in items
+            ))
+
+    async def _on_connect(self, client: aiomqtt.Client):
         """Handle the connection to the MQTT broker."""
-        if rc == 0:
-            _LOGGER.info("Connected to Bayrol MQTT broker with result code 0 (Success)")
-            # Resubscribe to all topics
-            for topic in self._subscribers:
-                client.subscribe(f"d02/{self.device_id}/v/{topic}")
-                client.publish(f"d02/{self.device_id}/g/{topic}")
-        else:
-            _LOGGER.error("Failed to connect to MQTT broker, result code: %s", rc)
+        _LOGGER.info("Connected to Bayrol MQTT broker")
+        # Resubscribe to all topics
+        for topic in list(self._subscribers):
+            await client.subscribe(f"d02/{self.device_id}/v/{topic}")
+            await client.publish(f"d02/{self.device_id}/g/{topic}")
 
-    def _on_message(self, client, userdata, msg):
+    async def _dispatch(self, msg: aiomqtt.Message):
         """Handle the incoming messages from the MQTT broker."""
         _LOGGER.debug("Received message from topic: %s", msg.topic)
 
         # Just get the last part of the topic
-        topic_parts = msg.topic.split("/")
-        topic = topic_parts[-1]
+        topic = msg.topic.value.rpartition("/")[2]
 
         if topic in self._subscribers:
             try:
-                payload = msg.payload
-                value = json.loads(payload)["v"]
-                
+                value = orjson.loads(msg.payload)["v"]
+
                 # If we have a callback handler, notify it
                 if self.callback_handler:
-                    # Use thread-safe method to call the handler
-                    self._loop.call_soon_threadsafe(
-                        self.callback_handler.handle_mqtt_message,
+                    self.callback_handler.handle_mqtt_message(
                         self.device_id,
                         topic,
                         value
                     )
-                
+
                 # Also call the direct subscriber callback
                 callback = self._subscribers[topic]
-                if asyncio.iscoroutinefunction(callback):
-                    self._loop.call_soon_threadsafe(
-                        lambda: asyncio.create_task(callback(value))
-                    )
-                else:
-                    self._loop.call_soon_threadsafe(
-                        lambda: callback(value)
-                    )
-                    
+                if callback is not None:
+                    if asyncio.iscoroutinefunction(callback):
+                        asyncio.create_task(callback(value))
+                    else:
+                        callback(value)
+
             except Exception as e:
                 _LOGGER.error("Invalid payload for %s: %s", msg.topic, e)
         else:
             _LOGGER.warning("Received message for unknown topic: %s", msg.topic)
 
-    def _on_disconnect(self, client, userdata, rc):
-        """Handle disconnection from the MQTT broker."""
-        if rc != 0:
-            _LOGGER.warning("Unexpected disconnection from MQTT broker, result code: %s", rc)
-
-    def _start(self):
-        """Start the MQTT manager."""
-        self.client = paho.Client(transport="websockets")
-        self.client.username_pw_set(self.mqtt_user, "1")
-        self.client.tls_set()
-        self.client.on_connect = self._on_connect
-        self.client.on_message = self._on_message
-        self.client.on_disconnect = self._on_disconnect
-        
-        try:
-            self.client.connect(settings.BAYROL_MQTT_HOST, settings.BAYROL_MQTT_PORT, 60)
-            _LOGGER.debug("MQTT connect() called for %s:%s", settings.BAYROL_MQTT_HOST, settings.BAYROL_MQTT_PORT)
-        except Exception as e:
-            _LOGGER.error("MQTT connect() failed: %s", e)
-            return
-            
-        self.client.loop_forever()
+    async def _run(self):
+        """Run the MQTT connection, reconnecting when it drops."""
+        while True:
+            try:
+                async with aiomqtt.Client(
+                    settings.BAYROL_MQTT_HOST,
+                    settings.BAYROL_MQTT_PORT,
+                    username=self.mqtt_user,
+                    password="1",
+                    transport="websockets",
+                    tls_context=_SHARED_SSL_CTX,
+                    keepalive=60
+                ) as client:
+                    self.client = client
+                    self._connected = True
+                    await self._on_connect(client)
+
+                    async for message in client.messages:
+                        await self._dispatch(message)
+            except aiomqtt.MqttError as e:
+                _LOGGER.warning("MQTT connection to %s:%s lost: %s",
+                                settings.BAYROL_MQTT_HOST, settings.BAYROL_MQTT_PORT, e)
+            finally:
+                self._connected = False
+                self.client = None
+
+            await asyncio.sleep(RECONNECT_INTERVAL)
 
     def start(self):
         """Start the MQTT manager."""
         _LOGGER.debug("Starting MQTT manager for device %s", self.device_id)
-        if not self.thread or not self.thread.is_alive():
-            self.thread = threading.Thread(target=self._start, daemon=True)
-            self.thread.start()
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._run())
 
-    def stop(self):
+    async def stop(self):
         """Stop the MQTT manager."""
         _LOGGER.debug("Stopping MQTT manager for device %s", self.device_id)
-        if self.client:
-            self.client.disconnect()
-            self.client.loop_stop()
-        if self.thread:
-            self.thread.join(timeout=5)
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
 
     def is_connected(self) -> bool:
         """Check if the MQTT client is connected."""
-        return self.client is not None and self.client.is_connected()
\ No newline at end of file
+        return self.client is not None and self._connected
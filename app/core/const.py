@@ -1,7 +1,41 @@
 """Constants for the Bayrol integration - extracted from Home Assistant."""
 
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Dict, Any, Callable, Final, FrozenSet, Mapping, Optional, Tuple
+
+__all__ = (
+    "DOMAIN",
+    "BAYROL_ACCESS_TOKEN",
+    "BAYROL_DEVICE_ID",
+    "BAYROL_DEVICE_TYPE",
+    "BAYROL_APP_LINK_CODE",
+    "DeviceType",
+    "SensorDeviceClass",
+    "SensorStateClass",
+    "SensorConfig",
+    "VALUE_TO_MQTT_AUTOMATIC",
+    "MQTT_TO_VALUE_AUTOMATIC",
+    "VALUE_TO_MQTT_PM5",
+    "MQTT_TO_VALUE_PM5",
+    "MQTT_KEYS_AUTOMATIC",
+    "MQTT_KEYS_PM5",
+    "SENSOR_TYPES_AUTOMATIC",
+    "SENSOR_TYPES_AUTOMATIC_SALT",
+    "SENSOR_TYPES_AUTOMATIC_CL_PH",
+    "SENSOR_TYPES_PM5_CHLORINE",
+    "get_sensor_types_for_device",
+    "get_sensor_type_keys",
+    "get_sensor_name_unit",
+)
 
 # Domain and keys
 DOMAIN = "bayrol"
@@ -23,18 +57,18 @@ class DeviceType(str, Enum):
     PM5_CHLORINE = "PM5 Chlorine"
 
 
-class SensorDeviceClass(str, Enum):
-    """Sensor device classes for categorization."""
-    PH = "ph"
-    TEMPERATURE = "temperature"
-    VOLTAGE = "voltage"
-    CURRENT = "current"
+class SensorDeviceClass:
+    """Sensor device classes for categorization (plain interned tag strings)."""
+    PH: Final[str] = sys.intern("ph")
+    TEMPERATURE: Final[str] = sys.intern("temperature")
+    VOLTAGE: Final[str] = sys.intern("voltage")
+    CURRENT: Final[str] = sys.intern("current")
 
 
-class SensorStateClass(str, Enum):
-    """Sensor state classes."""
-    MEASUREMENT = "measurement"
-    TOTAL_INCREASING = "total_increasing"
+class SensorStateClass:
+    """Sensor state classes (plain interned tag strings)."""
+    MEASUREMENT: Final[str] = sys.intern("measurement")
+    TOTAL_INCREASING: Final[str] = sys.intern("total_increasing")
 
 
 # MQTT value mappings for AS5 device
@@ -59,7 +93,7 @@ VALUE_TO_MQTT_AUTOMATIC = {
 }
 
 # Reverse mapping for MQTT values to display values
-MQTT_TO_VALUE_AUTOMATIC = {v: k for k, v in VALUE_TO_MQTT_AUTOMATIC.items()}
+MQTT_TO_VALUE_AUTOMATIC = dict(zip(VALUE_TO_MQTT_AUTOMATIC.values(), VALUE_TO_MQTT_AUTOMATIC))
 
 VALUE_TO_MQTT_PM5 = {
     "On": "7408",
@@ -68,417 +102,218 @@ VALUE_TO_MQTT_PM5 = {
 }
 
 # Reverse mapping for MQTT values to display values
-MQTT_TO_VALUE_PM5 = {v: k for k, v in VALUE_TO_MQTT_PM5.items()}
-
-
-# Sensor configuration type
-SensorConfig = Dict[str, Any]
-
-
-def create_sensor_config(
-    name: str,
-    device_class: Optional[str] = None,
-    state_class: Optional[str] = None,
-    coefficient: Optional[float] = None,
-    unit_of_measurement: Optional[str] = None,
-    entity_type: str = "sensor",
-    options: Optional[List[Any]] = None
-) -> SensorConfig:
-    """Create a sensor configuration dictionary."""
-    config = {
-        "name": name,
-        "device_class": device_class,
-        "state_class": state_class,
-        "coefficient": coefficient,
-        "unit_of_measurement": unit_of_measurement,
-        "entity_type": entity_type,
-    }
-    if options is not None:
-        config["options"] = options
-    return config
+MQTT_TO_VALUE_PM5 = dict(zip(VALUE_TO_MQTT_PM5.values(), VALUE_TO_MQTT_PM5))
+
+
+@dataclass(frozen=True, slots=True)
+class SensorConfig:
+    """Static configuration of a Bayrol sensor or select entity."""
+    name: str
+    device_class: Optional[str] = None
+    state_class: Optional[str] = None
+    # Integer divisor for raw values; -1 means "report the raw value as a string"
+    coefficient: Optional[int] = None
+    unit_of_measurement: Optional[str] = None
+    entity_type: str = "sensor"
+    options: Optional[Tuple[Any, ...]] = None
+    # Precomputed for constant-time validation of select values
+    options_set: FrozenSet[Any] = field(init=False, repr=False, compare=False)
+    options_parser: Callable[[str], Any] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        options = self.options or ()
+        object.__setattr__(self, "options_set", frozenset(options))
+        object.__setattr__(
+            self, "options_parser",
+            float if options and isinstance(options[0], (int, float)) else str
+        )
+
+
+# One sensor per row, in SensorConfig field order:
+# (sensor_type, name, device_class, state_class, coefficient, unit, entity_type, options)
+if TYPE_CHECKING:
+    _SensorRow = Tuple[str, str, Optional[str], Optional[str], Optional[int],
+                       Optional[str], str, Optional[Tuple[Any, ...]]]
+
+
+# Option lists, built once and referenced by the sensor rows below
+_PH_TARGET_OPTS = (6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2)
+_PH_ALERT_MAX_OPTS = (7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2, 8.3, 8.4, 8.5, 8.6, 8.7)
+_PH_ALERT_MIN_OPTS = (5.7, 5.8, 5.9, 6.0, 6.1, 6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2)
+_REDOX_ALERT_MAX_OPTS = tuple(range(995, 495, -5))
+_REDOX_ALERT_MIN_OPTS = tuple(range(850, 195, -5))
+_REDOX_TARGET_OPTS = tuple(range(950, 395, -5))
+_PRODUCTION_RATE_OPTS = ("0.25x", "0.5x", "0.75x", "1.0x", "1.25x", "1.5x", "2x", "3x", "5x", "10x")
+_ON_OFF_AUTO_OPTS = ("On", "Off", "Auto")
+# 1.0 to 5.0 in 0.1 steps
+_SALT_PREFERRED_OPTS = (1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.6, 1.7, 1.8, 1.9, 2.0, 2.1, 2.2, 2.3, 2.4, 2.5, 2.6, 2.7, 2.8, 2.9,
+                        3.0, 3.1, 3.2, 3.3, 3.4, 3.5, 3.6, 3.7, 3.8, 3.9, 4.0, 4.1, 4.2, 4.3, 4.4, 4.5, 4.6, 4.7, 4.8, 4.9,
+                        5.0)
 
+# Sensor tables are keyed by the dotted MQTT topic suffix (e.g. "4.2"). The same
+# string is the sensor_type stored in the database and used in API paths, and the
+# MQTT dispatcher looks it up as-is, so no per-message key parsing is needed.
 
 # Common sensor types for Automatic devices
-SENSOR_TYPES_AUTOMATIC: Dict[str, SensorConfig] = {
-    "4.2": create_sensor_config(
-        name="pH Target",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        entity_type="select",
-        options=[6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2]
-    ),
-    "4.3": create_sensor_config(
-        name="pH Alert Max",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        entity_type="select",
-        options=[7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2, 8.3, 8.4, 8.5, 8.6, 8.7]
-    ),
-    "4.4": create_sensor_config(
-        name="pH Alert Min",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        entity_type="select",
-        options=[5.7, 5.8, 5.9, 6.0, 6.1, 6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2]
-    ),
-    "4.5": create_sensor_config(
-        name="pH Dosing Control Time Interval",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="min"
-    ),
-    "4.7": create_sensor_config(
-        name="Minutes Counter / Reset every hour",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="min"
-    ),
-    "4.26": create_sensor_config(
-        name="Redox Alert Max",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(995, 495, -5))
-    ),
-    "4.27": create_sensor_config(
-        name="Redox Alert Min",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(850, 195, -5))
-    ),
-    "4.28": create_sensor_config(
-        name="Redox Target",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(950, 395, -5))
-    ),
-    "4.34": create_sensor_config(
-        name="Minimal Approach to Control the pH",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100
-    ),
-    "4.37": create_sensor_config(
-        name="Start Delay",
-        coefficient=1,
-        unit_of_measurement="min",
-        entity_type="select",
-        options=list(range(1, 61))
-    ),
-    "4.38": create_sensor_config(
-        name="pH Dosing Cycle",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="s"
-    ),
-    "4.47": create_sensor_config(
-        name="pH Dosing Speed",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="%"
-    ),
-    "4.67": create_sensor_config(
-        name="SW Version",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100
-    ),
-    "4.68": create_sensor_config(
-        name="SW Date",
-        coefficient=-1  # Treat result as string
-    ),
-    "4.69": create_sensor_config(
-        name="Hourly Counter / Reset every 24h",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="h"
-    ),
-    "4.82": create_sensor_config(
-        name="Redox",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV"
-    ),
-    "4.89": create_sensor_config(
-        name="pH Dosing Rate",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="%"
-    ),
-    "4.98": create_sensor_config(
-        name="Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="°C"
-    ),
-    "4.102": create_sensor_config(
-        name="Conductivity",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="mS/cm"
-    ),
-    "4.107": create_sensor_config(
-        name="Battery Voltage",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100,
-        unit_of_measurement="V"
-    ),
-    "4.182": create_sensor_config(
-        name="pH",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10
-    ),
-    "5.3": create_sensor_config(
-        name="pH Production Rate",
-        entity_type="select",
-        options=["0.25x", "0.5x", "0.75x", "1.0x", "1.25x", "1.5x", "2x", "3x", "5x", "10x"]
-    ),
-    "5.80": create_sensor_config(
-        name="pH Minus Canister Status"
-    ),
-    "5.98": create_sensor_config(
-        name="Filtration"
-    ),
-}
+_ROWS_AUTOMATIC: Tuple[_SensorRow, ...] = (
+    ("4.2", "pH Target", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 10, None, "select", _PH_TARGET_OPTS),
+    ("4.3", "pH Alert Max", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 10, None, "select", _PH_ALERT_MAX_OPTS),
+    ("4.4", "pH Alert Min", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 10, None, "select", _PH_ALERT_MIN_OPTS),
+    ("4.5", "pH Dosing Control Time Interval", None, SensorStateClass.MEASUREMENT, 1, "min", "sensor", None),
+    ("4.7", "Minutes Counter / Reset every hour", None, SensorStateClass.MEASUREMENT, 1, "min", "sensor", None),
+    ("4.26", "Redox Alert Max", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_ALERT_MAX_OPTS),
+    ("4.27", "Redox Alert Min", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_ALERT_MIN_OPTS),
+    ("4.28", "Redox Target", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_TARGET_OPTS),
+    ("4.34", "Minimal Approach to Control the pH", None, SensorStateClass.MEASUREMENT, 100, None, "sensor", None),
+    ("4.37", "Start Delay", None, None, 1, "min", "select",
+     tuple(range(1, 61))),
+    ("4.38", "pH Dosing Cycle", None, SensorStateClass.MEASUREMENT, 1, "s", "sensor", None),
+    ("4.47", "pH Dosing Speed", None, SensorStateClass.MEASUREMENT, 1, "%", "sensor", None),
+    ("4.67", "SW Version", None, SensorStateClass.MEASUREMENT, 100, None, "sensor", None),
+    ("4.68", "SW Date", None, None, -1, None, "sensor", None),  # Treat result as string
+    ("4.69", "Hourly Counter / Reset every 24h", None, SensorStateClass.MEASUREMENT, 1, "h", "sensor", None),
+    ("4.82", "Redox", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 1, "mV", "sensor", None),
+    ("4.89", "pH Dosing Rate", None, SensorStateClass.MEASUREMENT, 1, "%", "sensor", None),
+    ("4.98", "Temperature", SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT, 10, "°C", "sensor", None),
+    ("4.102", "Conductivity", None, SensorStateClass.MEASUREMENT, 10, "mS/cm", "sensor", None),
+    ("4.107", "Battery Voltage", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 100, "V", "sensor", None),
+    ("4.182", "pH", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 10, None, "sensor", None),
+    ("5.3", "pH Production Rate", None, None, None, None, "select", _PRODUCTION_RATE_OPTS),
+    ("5.80", "pH Minus Canister Status", None, None, None, None, "sensor", None),
+    ("5.98", "Filtration", None, None, None, None, "sensor", None),
+)
 
-# Additional sensor types for Automatic SALT
-SENSOR_TYPES_AUTOMATIC_SALT: Dict[str, SensorConfig] = {
-    **SENSOR_TYPES_AUTOMATIC,  # Include all base sensors
-    "4.51": create_sensor_config(
-        name="Polarity Reversal Times",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="min"
-    ),
-    "4.66": create_sensor_config(
-        name="Minimum Redox Produktion",
-        coefficient=1,
-        unit_of_measurement="%",
-        entity_type="select",
-        options=[100, 95, 90, 85, 80, 75, 70, 65, 60, 55, 50, 45, 40, 35, 30, 25, 20, 15]
-    ),
-    "4.91": create_sensor_config(
-        name="Electrolyzer Production Rate",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="%"
-    ),
-    "4.100": create_sensor_config(
-        name="Salt",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="g/l"
-    ),
-    "4.104": create_sensor_config(
-        name="Electrolyzer Voltage",
-        device_class=SensorDeviceClass.VOLTAGE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="V"
-    ),
-    "4.105": create_sensor_config(
-        name="Electrolyzer Current",
-        device_class=SensorDeviceClass.CURRENT,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="A"
-    ),
-    "4.112": create_sensor_config(
-        name="Time Before Next Polarity Reversal",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="s"
-    ),
-    "4.119": create_sensor_config(
-        name="Time Since Polarity Reversal",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="s"
-    ),
-    "4.144": create_sensor_config(
-        name="Salt Preferred Level",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="g/l",
-        entity_type="select",
-        options=[round(x * 0.1, 1) for x in range(10, 51)]  # 1.0 to 5.0
-    ),
-    "5.40": create_sensor_config(
-        name="Redox ON / OFF",
-        entity_type="select",
-        options=["On", "Off"]
-    ),
-    "5.41": create_sensor_config(
-        name="Redox Mode",
-        entity_type="select",
-        options=["Auto", "Auto Plus", "Constant production"]
-    ),
-}
 
-# Additional sensor types for Automatic Cl-pH
-SENSOR_TYPES_AUTOMATIC_CL_PH: Dict[str, SensorConfig] = {
-    **SENSOR_TYPES_AUTOMATIC,  # Include all base sensors
-    "4.90": create_sensor_config(
-        name="Cl Dosing Rate",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="%"
-    ),
-    "5.175": create_sensor_config(
-        name="Cl Adjust Dosing Amount",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="%",
-        entity_type="select",
-        options=["0.25x", "0.5x", "0.75x", "1.0x", "1.25x", "1.5x", "2x", "3x", "5x", "10x"]
-    ),
-    "5.169": create_sensor_config(
-        name="Cl Canister Status"
-    ),
-}
+# Sensor types for Automatic SALT (common + additional)
+_ROWS_AUTOMATIC_SALT: Tuple[_SensorRow, ...] = (
+    ("4.51", "Polarity Reversal Times", None, SensorStateClass.MEASUREMENT, 1, "min", "sensor", None),
+    ("4.66", "Minimum Redox Produktion", None, None, 1, "%", "select",
+     (100, 95, 90, 85, 80, 75, 70, 65, 60, 55, 50, 45, 40, 35, 30, 25, 20, 15)),
+    ("4.91", "Electrolyzer Production Rate", None, SensorStateClass.MEASUREMENT, 1, "%", "sensor", None),
+    ("4.100", "Salt", None, SensorStateClass.MEASUREMENT, 10, "g/l", "sensor", None),
+    ("4.104", "Electrolyzer Voltage", SensorDeviceClass.VOLTAGE, SensorStateClass.MEASUREMENT, 10, "V", "sensor", None),
+    ("4.105", "Electrolyzer Current", SensorDeviceClass.CURRENT, SensorStateClass.MEASUREMENT, 10, "A", "sensor", None),
+    ("4.112", "Time Before Next Polarity Reversal", None, SensorStateClass.MEASUREMENT, 1, "s", "sensor", None),
+    ("4.119", "Time Since Polarity Reversal", None, SensorStateClass.MEASUREMENT, 1, "s", "sensor", None),
+    ("4.144", "Salt Preferred Level", None, SensorStateClass.MEASUREMENT, 10, "g/l", "select", _SALT_PREFERRED_OPTS),
+    ("5.40", "Redox ON / OFF", None, None, None, None, "select",
+     ("On", "Off")),
+    ("5.41", "Redox Mode", None, None, None, None, "select",
+     ("Auto", "Auto Plus", "Constant production")),
+)
+
+
+# Sensor types for Automatic Cl-pH (common + additional)
+_ROWS_AUTOMATIC_CL_PH: Tuple[_SensorRow, ...] = (
+    ("4.90", "Cl Dosing Rate", None, SensorStateClass.MEASUREMENT, 1, "%", "sensor", None),
+    ("5.175", "Cl Adjust Dosing Amount", None, SensorStateClass.MEASUREMENT, 1, "%", "select", _PRODUCTION_RATE_OPTS),
+    ("5.169", "Cl Canister Status", None, None, None, None, "sensor", None),
+)
+
 
 # Sensor types for PM5 Chlorine
-SENSOR_TYPES_PM5_CHLORINE: Dict[str, SensorConfig] = {
-    "4.3001": create_sensor_config(
-        name="pH Target",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100,
-        entity_type="select",
-        options=[6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2]
-    ),
-    "4.3002": create_sensor_config(
-        name="pH Alert Min",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100,
-        entity_type="select",
-        options=[5.7, 5.8, 5.9, 6.0, 6.1, 6.2, 6.3, 6.4, 6.5, 6.6, 6.7, 6.8, 6.9, 7.0, 7.1, 7.2]
-    ),
-    "4.3003": create_sensor_config(
-        name="pH Alert Max",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100,
-        entity_type="select",
-        options=[7.2, 7.3, 7.4, 7.5, 7.6, 7.7, 7.8, 7.9, 8.0, 8.1, 8.2, 8.3, 8.4, 8.5, 8.6, 8.7]
-    ),
-    "4.3049": create_sensor_config(
-        name="Redox Target",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(950, 395, -5))
-    ),
-    "4.3051": create_sensor_config(
-        name="Redox Alert Min",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(850, 195, -5))
-    ),
-    "4.3053": create_sensor_config(
-        name="Redox Alert Max",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV",
-        entity_type="select",
-        options=list(range(995, 495, -5))
-    ),
-    "4.4001": create_sensor_config(
-        name="pH",
-        device_class=SensorDeviceClass.PH,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=100
-    ),
-    "4.4022": create_sensor_config(
-        name="Redox",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1,
-        unit_of_measurement="mV"
-    ),
-    "4.4033": create_sensor_config(
-        name="Water Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="°C"
-    ),
-    "4.4069": create_sensor_config(
-        name="Air Temperature",
-        device_class=SensorDeviceClass.TEMPERATURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=10,
-        unit_of_measurement="°C"
-    ),
-    "4.4132": create_sensor_config(
-        name="Active Alarms",
-        state_class=SensorStateClass.MEASUREMENT,
-        coefficient=1
-    ),
-    "5.5433": create_sensor_config(
-        name="Out 1",
-        entity_type="select",
-        options=["On", "Off", "Auto"]
-    ),
-    "5.5434": create_sensor_config(
-        name="Out 2",
-        entity_type="select",
-        options=["On", "Off", "Auto"]
-    ),
-    "5.5435": create_sensor_config(
-        name="Out 3",
-        entity_type="select",
-        options=["On", "Off", "Auto"]
-    ),
-    "5.5436": create_sensor_config(
-        name="Out 4",
-        entity_type="select",
-        options=["On", "Off", "Auto"]
-    ),
-    "5.6012": create_sensor_config(
-        name="pH Pump"
-    ),
-    "5.6015": create_sensor_config(
-        name="Redox Pump Status"
-    ),
-    "5.6064": create_sensor_config(
-        name="pH Canister Level"
-    ),
-    "5.6065": create_sensor_config(
-        name="pH Status"
-    ),
-    "5.6068": create_sensor_config(
-        name="Redox Canister Level"
-    ),
-    "5.6069": create_sensor_config(
-        name="Redox Status"
-    ),
-}
+_ROWS_PM5_CHLORINE: Tuple[_SensorRow, ...] = (
+    ("4.3001", "pH Target", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 100, None, "select", _PH_TARGET_OPTS),
+    ("4.3002", "pH Alert Min", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 100, None, "select", _PH_ALERT_MIN_OPTS),
+    ("4.3003", "pH Alert Max", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 100, None, "select", _PH_ALERT_MAX_OPTS),
+    ("4.3049", "Redox Target", None, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_TARGET_OPTS),
+    ("4.3051", "Redox Alert Min", None, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_ALERT_MIN_OPTS),
+    ("4.3053", "Redox Alert Max", None, SensorStateClass.MEASUREMENT, 1, "mV", "select", _REDOX_ALERT_MAX_OPTS),
+    ("4.4001", "pH", SensorDeviceClass.PH, SensorStateClass.MEASUREMENT, 100, None, "sensor", None),
+    ("4.4022", "Redox", None, SensorStateClass.MEASUREMENT, 1, "mV", "sensor", None),
+    ("4.4033", "Water Temperature", SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT, 10, "°C", "sensor", None),
+    ("4.4069", "Air Temperature", SensorDeviceClass.TEMPERATURE, SensorStateClass.MEASUREMENT, 10, "°C", "sensor", None),
+    ("4.4132", "Active Alarms", None, SensorStateClass.MEASUREMENT, 1, None, "sensor", None),
+    ("5.5433", "Out 1", None, None, None, None, "select", _ON_OFF_AUTO_OPTS),
+    ("5.5434", "Out 2", None, None, None, None, "select", _ON_OFF_AUTO_OPTS),
+    ("5.5435", "Out 3", None, None, None, None, "select", _ON_OFF_AUTO_OPTS),
+    ("5.5436", "Out 4", None, None, None, None, "select", _ON_OFF_AUTO_OPTS),
+    ("5.6012", "pH Pump", None, None, None, None, "sensor", None),
+    ("5.6015", "Redox Pump Status", None, None, None, None, "sensor", None),
+    ("5.6064", "pH Canister Level", None, None, None, None, "sensor", None),
+    ("5.6065", "pH Status", None, None, None, None, "sensor", None),
+    ("5.6068", "Redox Canister Level", None, None, None, None, "sensor", None),
+    ("5.6069", "Redox Status", None, None, None, None, "sensor", None),
+)
+
 
+# The option lists live on in the rows; drop the module-level names
+del (_PH_TARGET_OPTS, _PH_ALERT_MAX_OPTS, _PH_ALERT_MIN_OPTS, _REDOX_ALERT_MAX_OPTS,
+     _REDOX_ALERT_MIN_OPTS, _REDOX_TARGET_OPTS, _PRODUCTION_RATE_OPTS, _ON_OFF_AUTO_OPTS,
+     _SALT_PREFERRED_OPTS)
 
-def get_sensor_types_for_device(device_type: str) -> Dict[str, SensorConfig]:
+# Freeze the lookup tables now that the derived ones are built from them
+VALUE_TO_MQTT_AUTOMATIC = MappingProxyType(VALUE_TO_MQTT_AUTOMATIC)
+MQTT_TO_VALUE_AUTOMATIC = MappingProxyType(MQTT_TO_VALUE_AUTOMATIC)
+VALUE_TO_MQTT_PM5 = MappingProxyType(VALUE_TO_MQTT_PM5)
+MQTT_TO_VALUE_PM5 = MappingProxyType(MQTT_TO_VALUE_PM5)
+
+# Key sets for pure membership tests on incoming MQTT values
+MQTT_KEYS_AUTOMATIC: FrozenSet[str] = frozenset(MQTT_TO_VALUE_AUTOMATIC)
+MQTT_KEYS_PM5: FrozenSet[str] = frozenset(MQTT_TO_VALUE_PM5)
+
+
+# Sensor tables are built on first use (see __getattr__), so a process only
+# pays for the device types it actually serves
+# table name -> (base table it extends, its own rows)
+_SENSOR_TABLE_ROWS: Mapping[str, Tuple[Optional[str], Tuple[_SensorRow, ...]]] = MappingProxyType({
+    "SENSOR_TYPES_AUTOMATIC": (None, _ROWS_AUTOMATIC),
+    "SENSOR_TYPES_AUTOMATIC_SALT": ("SENSOR_TYPES_AUTOMATIC", _ROWS_AUTOMATIC_SALT),
+    "SENSOR_TYPES_AUTOMATIC_CL_PH": ("SENSOR_TYPES_AUTOMATIC", _ROWS_AUTOMATIC_CL_PH),
+    "SENSOR_TYPES_PM5_CHLORINE": (None, _ROWS_PM5_CHLORINE),
+})
+_SENSOR_TABLES: Dict[str, Mapping[str, SensorConfig]] = {}
+_NO_SENSOR_TYPES: Mapping[str, SensorConfig] = MappingProxyType({})
+
+# Sensor table per device type, keyed by the plain string values so lookups
+# stay exact-str hash probes (DeviceType members compare equal and also match)
+_SENSOR_TABLE_BY_DEVICE: Mapping[str, str] = MappingProxyType({
+    DeviceType.AUTOMATIC_SALT.value: "SENSOR_TYPES_AUTOMATIC_SALT",
+    DeviceType.AUTOMATIC_CL_PH.value: "SENSOR_TYPES_AUTOMATIC_CL_PH",
+    DeviceType.PM5_CHLORINE.value: "SENSOR_TYPES_PM5_CHLORINE",
+})
+
+
+def _sensor_types(name: str) -> Mapping[str, SensorConfig]:
+    """Get a sensor table by name, building and freezing it on first use."""
+    table = _SENSOR_TABLES.get(name)
+    if table is None:
+        base, rows = _SENSOR_TABLE_ROWS[name]
+        configs = dict(_sensor_types(base)) if base else {}
+        configs.update({row[0]: SensorConfig(*row[1:]) for row in rows})
+        table = _SENSOR_TABLES[name] = MappingProxyType(configs)
+    return table
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the SENSOR_TYPES_* tables lazily (PEP 562)."""
+    if name in _SENSOR_TABLE_ROWS:
+        return _sensor_types(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=16)
+def get_sensor_types_for_device(device_type: str) -> Mapping[str, SensorConfig]:
     """Get the sensor types for a specific device type."""
-    if device_type == DeviceType.AUTOMATIC_SALT:
-        return SENSOR_TYPES_AUTOMATIC_SALT
-    elif device_type == DeviceType.AUTOMATIC_CL_PH:
-        return SENSOR_TYPES_AUTOMATIC_CL_PH
-    elif device_type == DeviceType.PM5_CHLORINE:
-        return SENSOR_TYPES_PM5_CHLORINE
-    else:
-        return {}
\ No newline at end of file
+    name = _SENSOR_TABLE_BY_DEVICE.get(device_type)
+    return _sensor_types(name) if name else _NO_SENSOR_TYPES
+
+
+@lru_cache(maxsize=16)
+def get_sensor_type_keys(device_type: str) -> FrozenSet[str]:
+    """Get the valid sensor IDs for a device type as a frozenset."""
+    return frozenset(get_sensor_types_for_device(device_type))
+
+
+@lru_cache(maxsize=16)
+def _sensor_name_units(device_type: str) -> Mapping[str, Tuple[str, str]]:
+    """Get sensor_type -> (display name, unit) for a device type."""
+    return MappingProxyType({
+        sensor_type: (config.name, config.unit_of_measurement or "")
+        for sensor_type, config in get_sensor_types_for_device(device_type).items()
+    })
+
+
+def get_sensor_name_unit(device_type: str, sensor_type: str) -> Tuple[str, str]:
+    """Get the display name and unit for a sensor of a device type."""
+    return _sensor_name_units(device_type).get(sensor_type, (sensor_type, ""))
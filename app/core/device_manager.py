@@ -2,31 +2,106 @@
 
 import asyncio
 import logging
+import uuid
 from datetime import datetime
-from typing import Dict, Optional, List, Any
+from types import MappingProxyType
+from typing import Dict, Optional, List, Any, Mapping, Set
 from uuid import UUID
 
+import asyncpg
+import orjson
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.bayrol_mqtt import BayrolMQTTManager
-from app.core.const import get_sensor_types_for_device
-from app.core.sensor_handler import format_sensor_value
-from app.models.database import Device, SensorReading
-from app.database import async_session_maker
+from app.core.const import SensorConfig, get_sensor_types_for_device
+from app.core.sensor_handler import get_sensor_formatters, get_mqtt_value_for_select
+from app.models.database import Alarm, Device
+from app.database import async_session_maker, engine
+from app.services.alarm_service import AlarmService
+from app.services.notification_service import notification_service
 from app.services.redis_service import redis_service
 
 _LOGGER = logging.getLogger(__name__)
 
+# Batched sensor_readings writes: flush at this many rows or after this many seconds
+_READING_BATCH_SIZE = 5000
+_READING_BATCH_INTERVAL = 0.2
+# Newest value per (device, sensor) of each batch, upserted in one statement
+_LATEST_READINGS_UPSERT = """
+    INSERT INTO latest_sensor_readings AS l
+        (device_id, sensor_type, time, sensor_name, raw_value, value, formatted_value, unit)
+    SELECT * FROM unnest(
+        $1::uuid[], $2::varchar[], $3::timestamp[], $4::varchar[],
+        $5::float8[], $6::text[], $7::text[], $8::varchar[]
+    )
+    ON CONFLICT (device_id, sensor_type) DO UPDATE SET
+        time = EXCLUDED.time,
+        sensor_name = EXCLUDED.sensor_name,
+        raw_value = EXCLUDED.raw_value,
+        value = EXCLUDED.value,
+        formatted_value = EXCLUDED.formatted_value,
+        unit = EXCLUDED.unit
+    WHERE l.time < EXCLUDED.time
+"""
+# Readings buffered in memory while the database is slow or down; beyond this they are dropped
+_READING_QUEUE_SIZE = 100000
+# Attempts per batch before it is dropped, with exponential backoff between them
+_READING_WRITE_ATTEMPTS = 5
+_READING_RETRY_DELAY = 0.5
+_READING_RETRY_MAX_DELAY = 30
+# Failures worth retrying: the database is unreachable, restarting or overloaded.
+# Anything else (constraint violations, bad data) fails the same way every time
+_TRANSIENT_WRITE_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.OperatorInterventionError,
+    asyncpg.InsufficientResourcesError,
+    asyncpg.TransactionRollbackError,
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+    sa_exc.TimeoutError,
+)
+_READING_COLUMNS = [
+    'id', 'time', 'device_id', 'sensor_type', 'sensor_name',
+    'raw_value', 'value', 'formatted_value', 'unit'
+]
+
+# Alarm checks run off the MQTT path on this many workers, with a bounded backlog
+_ALARM_WORKERS = 4
+_ALARM_QUEUE_SIZE = 10000
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """Convert a raw MQTT value to float, or None if it isn't numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class DeviceManager:
     """Manages multiple Bayrol devices and their MQTT connections."""
     
     def __init__(self):
         """Initialize the device manager."""
-        self.devices: Dict[UUID, Dict[str, Any]] = {}
+        self.devices: Dict[UUID, Dict[str, Any]] = {}  # device_id -> device metadata
+        self._device_sensors: Dict[UUID, Dict[str, Any]] = {}  # device_id -> current sensor values
+        self._sensor_views: Dict[UUID, Mapping[str, Any]] = {}  # device_id -> read-only sensor view
+        self._device_mqtt: Dict[UUID, BayrolMQTTManager] = {}  # device_id -> MQTT manager
+        self._by_serial: Dict[str, UUID] = {}  # device serial -> device_id
         self._sensor_callbacks: Dict[str, List[Any]] = {}  # device_id -> callbacks
-        self._websocket_connections: Dict[UUID, List[Any]] = {}  # device_id -> websockets
+        self._websocket_connections: Dict[UUID, Set[Any]] = {}  # device_id -> websockets
+        self._alarm_index: Dict[UUID, Set[str]] = {}  # device_id -> sensor types with enabled alarms
+        self._reading_queue: asyncio.Queue = asyncio.Queue(maxsize=_READING_QUEUE_SIZE)  # sensor_readings rows to write
+        self._dropped_readings = 0  # readings lost to a full queue or failed writes
+        self._reading_writer: Optional[asyncio.Task] = None
+        self._alarm_queue: asyncio.Queue = asyncio.Queue(maxsize=_ALARM_QUEUE_SIZE)  # pending alarm checks
+        self._alarm_workers: List[asyncio.Task] = []
+        self._update_tasks: Set[asyncio.Task] = set()  # in-flight sensor update handlers
         
     async def load_devices_from_db(self):
         """Load all active devices from database and start their MQTT connections."""
@@ -36,17 +111,48 @@ class DeviceManager:
             )
             devices = result.scalars().all()
             
-            for device in devices:
-                try:
-                    await self.add_device(
+            # Index which sensors have enabled alarms, so the rest skip alarm checks;
+            # loaded before any MQTT client starts so no early message misses a check
+            result = await session.execute(
+                select(Alarm.device_id, Alarm.sensor_type).where(Alarm.enabled == True)
+            )
+            self._alarm_index.clear()
+            for alarm_device_id, sensor_type in result:
+                self._alarm_index.setdefault(alarm_device_id, set()).add(sensor_type)
+            
+            # Bring all devices up concurrently rather than one after another
+            results = await asyncio.gather(
+                *(
+                    self.add_device(
                         device_id=device.id,
                         device_serial=device.device_id,
                         access_token=device.access_token,
                         device_type=device.device_type,
                         device_name=device.name
                     )
-                except Exception as e:
-                    _LOGGER.error(f"Failed to load device {device.device_id}: {e}")
+                    for device in devices
+                ),
+                return_exceptions=True
+            )
+            for device, outcome in zip(devices, results):
+                if isinstance(outcome, Exception):
+                    _LOGGER.error(f"Failed to load device {device.device_id}: {outcome}")
+    
+    async def refresh_alarm_index(self, device_id: UUID):
+        """Reload which sensors of a device have enabled alarms (call after alarm changes)."""
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Alarm.sensor_type).where(
+                    Alarm.device_id == device_id,
+                    Alarm.enabled == True
+                )
+            )
+            sensor_types = set(result.scalars())
+        
+        if sensor_types:
+            self._alarm_index[device_id] = sensor_types
+        else:
+            self._alarm_index.pop(device_id, None)
     
     async def add_device(self, device_id: UUID, device_serial: str, 
                         access_token: str, device_type: str, 
@@ -73,21 +179,24 @@ class DeviceManager:
                 'serial': device_serial,
                 'name': device_name,
                 'type': device_type,
-                'mqtt_manager': mqtt_manager,
-                'sensors': {},
                 'sensor_configs': sensor_types,
+                'sensor_formatters': get_sensor_formatters(device_type),
                 'last_seen': None,
                 'is_connected': False
             }
+            # Sensor values and the MQTT manager live in their own maps so
+            # listings and sensor updates only touch the data they need
+            sensors = self._device_sensors[device_id] = {}
+            # Read-only view handed to API readers instead of a copy
+            self._sensor_views[device_id] = MappingProxyType(sensors)
+            self._device_mqtt[device_id] = mqtt_manager
+            self._by_serial[device_serial] = device_id
             
-            # Subscribe to all sensors for this device
+            # Subscribe to all sensors for this device; messages are routed
+            # back through handle_mqtt_message, so no per-sensor callbacks
             for sensor_id, sensor_config in sensor_types.items():
-                if sensor_config.get("entity_type") == "sensor":
-                    # Create callback for this sensor
-                    async def sensor_callback(value, dev_id=device_id, s_id=sensor_id):
-                        await self._handle_sensor_update(dev_id, s_id, value)
-                    
-                    mqtt_manager.subscribe(sensor_id, sensor_callback)
+                if sensor_config.entity_type == "sensor":
+                    await mqtt_manager.subscribe(sensor_id)
             
             # Start MQTT connection
             mqtt_manager.start()
@@ -97,8 +206,7 @@ class DeviceManager:
             
         except Exception as e:
             _LOGGER.error(f"Failed to add device {device_serial}: {e}")
-            if device_id in self.devices:
-                del self.devices[device_id]
+            self._forget_device(device_id, device_serial)
             return False
     
     async def remove_device(self, device_id: UUID) -> bool:
@@ -107,13 +215,12 @@ class DeviceManager:
             return False
         
         device_info = self.devices[device_id]
-        mqtt_manager = device_info['mqtt_manager']
         
         # Stop MQTT connection
-        mqtt_manager.stop()
+        await self._device_mqtt[device_id].stop()
         
         # Remove from active devices
-        del self.devices[device_id]
+        self._forget_device(device_id, device_info['serial'])
         
         # Clean up callbacks and connections
         if str(device_id) in self._sensor_callbacks:
@@ -124,6 +231,14 @@ class DeviceManager:
         _LOGGER.info(f"Removed device {device_info['serial']}")
         return True
     
+    def _forget_device(self, device_id: UUID, device_serial: str):
+        """Drop a device from every per-device map."""
+        self.devices.pop(device_id, None)
+        self._device_sensors.pop(device_id, None)
+        self._sensor_views.pop(device_id, None)
+        self._device_mqtt.pop(device_id, None)
+        self._by_serial.pop(device_serial, None)
+    
     def get_device(self, device_id: UUID) -> Optional[Dict[str, Any]]:
         """Get device information."""
         return self.devices.get(device_id)
@@ -142,13 +257,9 @@ class DeviceManager:
             for dev in self.devices.values()
         ]
     
-    def get_device_sensors(self, device_id: UUID) -> Dict[str, Any]:
-        """Get current sensor values for a device."""
-        device = self.devices.get(device_id)
-        if not device:
-            return {}
-        
-        return device['sensors'].copy()
+    def get_device_sensors(self, device_id: UUID) -> Mapping[str, Any]:
+        """Get a read-only live view of the current sensor values for a device."""
+        return self._sensor_views.get(device_id, {})
     
     async def _handle_sensor_update(self, device_id: UUID, sensor_id: str, value: Any):
         """Handle sensor value update from MQTT."""
@@ -156,30 +267,34 @@ class DeviceManager:
         if not device:
             return
         
+        # One timestamp per message, shared by last_seen, the sensor state and the stored reading
+        now = datetime.utcnow()
+        
         # Update connection status
-        device['last_seen'] = datetime.utcnow()
+        device['last_seen'] = now
         device['is_connected'] = True
         
         # Get sensor config
-        sensor_config = device['sensor_configs'].get(sensor_id)
+        sensor_config: Optional[SensorConfig] = device['sensor_configs'].get(sensor_id)
         if not sensor_config:
             return
         
         # Format the sensor value
-        formatted = format_sensor_value(sensor_config, value)
+        formatted = device['sensor_formatters'][sensor_id](value)
         
         # Update in-memory state
-        device['sensors'][sensor_id] = {
+        sensor_state = self._device_sensors[device_id][sensor_id] = {
             'sensor_type': sensor_id,
-            'sensor_name': sensor_config['name'],
+            'sensor_name': sensor_config.name,
             'value': formatted['value'],
             'formatted_value': formatted['formatted_value'],
             'unit': formatted.get('unit'),
-            'timestamp': datetime.utcnow()
+            'timestamp': now
         }
         
-        # Cache sensor value for quick access
-        await redis_service.cache_sensor_value(
+        # Cache sensor value for quick access and drop the cached /current
+        # response, which no longer reflects this value (one pipelined round-trip)
+        await redis_service.update_sensor_value(
             str(device_id), 
             sensor_id, 
             formatted['value'], 
@@ -187,32 +302,164 @@ class DeviceManager:
         )
         
         # Save to database
-        await self._save_sensor_reading(device_id, sensor_id, sensor_config['name'], formatted)
+        await self._save_sensor_reading(device_id, sensor_id, sensor_config.name, formatted, now)
         
         # Notify callbacks
-        await self._notify_sensor_callbacks(device_id, sensor_id, device['sensors'][sensor_id])
+        await self._notify_sensor_callbacks(device_id, sensor_id, sensor_state)
         
-        # Check alarms
-        await self._check_alarms(device_id, sensor_id, formatted['value'])
+        # Check alarms in the background so slow notifications don't stall ingestion;
+        # sensors without enabled alarms skip the check entirely
+        if sensor_id in self._alarm_index.get(device_id, ()):
+            try:
+                self._alarm_queue.put_nowait((device_id, sensor_id, formatted['value']))
+            except asyncio.QueueFull:
+                _LOGGER.warning(f"Alarm queue full, skipping alarm check for device {device_id}, sensor {sensor_id}")
     
     async def _save_sensor_reading(self, device_id: UUID, sensor_type: str, 
-                                  sensor_name: str, formatted: Dict[str, Any]):
-        """Save sensor reading to database."""
+                                  sensor_name: str, formatted: Dict[str, Any],
+                                  timestamp: datetime):
+        """Queue sensor reading for the batched database writer."""
+        if self._reading_queue.full():
+            self._drop_readings(1, "reading queue full")
+            return
+        self._reading_queue.put_nowait((
+            uuid.uuid4(),
+            timestamp,
+            device_id,
+            sensor_type,
+            sensor_name,
+            _to_float(formatted['raw_value']),
+            str(formatted['value']),  # Convert to string
+            formatted['formatted_value'],
+            formatted.get('unit')
+        ))
+    
+    def start_reading_writer(self):
+        """Start the background task that writes queued sensor readings."""
+        if self._reading_writer is None or self._reading_writer.done():
+            self._reading_writer = asyncio.create_task(self._reading_writer_loop())
+    
+    async def _reading_writer_loop(self):
+        """Drain queued readings into the database in batches."""
+        loop = asyncio.get_running_loop()
+        batch = []
         try:
-            async with async_session_maker() as session:
-                reading = SensorReading(
-                    device_id=device_id,
-                    sensor_type=sensor_type,
-                    sensor_name=sensor_name,
-                    raw_value=formatted['raw_value'],
-                    value=str(formatted['value']),  # Convert to string
-                    formatted_value=formatted['formatted_value'],
-                    unit=formatted.get('unit')
+            while True:
+                batch.append(await self._reading_queue.get())
+                
+                # Collect until the batch is full or the interval has elapsed
+                deadline = loop.time() + _READING_BATCH_INTERVAL
+                while len(batch) < _READING_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._reading_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                
+                await self._write_readings_with_retry(batch)
+                batch = []
+        except asyncio.CancelledError:
+            # Flush everything still pending before stopping
+            while not self._reading_queue.empty():
+                batch.append(self._reading_queue.get_nowait())
+            # One attempt only, shutdown shouldn't wait on an unavailable database
+            batch = self._known_device_readings(batch)
+            if batch:
+                try:
+                    await self._write_readings(batch)
+                except Exception as e:
+                    _LOGGER.error(f"Failed to save {len(batch)} sensor readings: {e}")
+                    self._drop_readings(len(batch), "write failed during shutdown")
+            raise
+    
+    def _known_device_readings(self, records: List[tuple]) -> List[tuple]:
+        """Discard readings of devices removed since they were queued."""
+        known = [record for record in records if record[2] in self.devices]
+        if len(known) < len(records):
+            _LOGGER.debug(f"Discarded {len(records) - len(known)} readings of removed devices")
+        return known
+    
+    async def _write_readings_with_retry(self, records: List[tuple]):
+        """
+        Write a batch, retrying connection and timeout errors with exponential backoff.
+        
+        Permanent errors drop the batch straight away instead of blocking the
+        writer on retries that would fail the same way.
+        """
+        delay = _READING_RETRY_DELAY
+        attempt = 1
+        while True:
+            # Their rows would violate the sensor_readings foreign key
+            records = self._known_device_readings(records)
+            if not records:
+                return
+            try:
+                await self._write_readings(records)
+                return
+            except _TRANSIENT_WRITE_ERRORS as e:
+                _LOGGER.error(f"Failed to save {len(records)} sensor readings: {e}")
+                if attempt == _READING_WRITE_ATTEMPTS:
+                    self._drop_readings(len(records), f"write failed {attempt} times")
+                    return
+                _LOGGER.warning(
+                    f"Retrying {len(records)} sensor readings in {delay}s "
+                    f"(attempt {attempt}/{_READING_WRITE_ATTEMPTS})"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _READING_RETRY_MAX_DELAY)
+                attempt += 1
+            except Exception as e:
+                # A device removed mid-write shows up as a foreign key violation;
+                # go again without its rows rather than dropping the whole batch
+                if (isinstance(e, asyncpg.ForeignKeyViolationError)
+                        and len(self._known_device_readings(records)) < len(records)):
+                    continue
+                _LOGGER.error(f"Failed to save {len(records)} sensor readings: {e}")
+                self._drop_readings(len(records), "write rejected by the database")
+                return
+    
+    async def _write_readings(self, records: List[tuple]):
+        """
+        Bulk insert sensor readings with COPY and refresh latest_sensor_readings.
+        
+        Both happen in one transaction; errors are raised to the caller.
+        """
+        # Newest record per (device, sensor); a batch may hold several of each
+        latest = {}
+        for record in records:
+            key = (record[2], record[3])
+            current = latest.get(key)
+            if current is None or record[1] > current[1]:
+                latest[key] = record
+        # Columns of the upsert, skipping the reading id
+        latest_columns = list(zip(*(record[1:] for record in latest.values())))
+        
+        async with engine.connect() as conn:
+            raw_connection = await conn.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            async with driver_connection.transaction():
+                await driver_connection.copy_records_to_table(
+                    'sensor_readings',
+                    records=records,
+                    columns=_READING_COLUMNS
+                )
+                times, device_ids, sensor_types, *values = latest_columns
+                await driver_connection.execute(
+                    _LATEST_READINGS_UPSERT, device_ids, sensor_types, times, *values
                 )
-                session.add(reading)
-                await session.commit()
-        except Exception as e:
-            _LOGGER.error(f"Failed to save sensor reading: {e}")
+    
+    def _drop_readings(self, count: int, reason: str):
+        """Count and log sensor readings that will never be written."""
+        first_drop = self._dropped_readings == 0
+        self._dropped_readings += count
+        # A full queue drops one reading per message; don't log every one of them
+        if count > 1 or first_drop or self._dropped_readings % 1000 == 0:
+            _LOGGER.error(
+                f"Dropped {count} sensor readings ({reason}), "
+                f"{self._dropped_readings} dropped in total"
+            )
     
     async def _notify_sensor_callbacks(self, device_id: UUID, sensor_id: str, data: Dict[str, Any]):
         """Notify registered callbacks about sensor update."""
@@ -231,28 +478,49 @@ class DeviceManager:
                 }
             }
             
-            for ws in self._websocket_connections[device_id]:
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    _LOGGER.error(f"Failed to send WebSocket message: {e}")
+            # Encode once and fan the same text frame out to every subscriber
+            payload = orjson.dumps(message).decode()
+            sockets = tuple(self._websocket_connections[device_id])
+            results = await asyncio.gather(
+                *(ws.send_text(payload) for ws in sockets),
+                return_exceptions=True
+            )
+            
+            for ws, result in zip(sockets, results):
+                if isinstance(result, Exception):
+                    _LOGGER.error(f"Failed to send WebSocket message: {result}")
+                    self.unregister_websocket(device_id, ws)
+    
+    def start_alarm_workers(self):
+        """Start the background tasks that run queued alarm checks."""
+        self._alarm_workers = [task for task in self._alarm_workers if not task.done()]
+        while len(self._alarm_workers) < _ALARM_WORKERS:
+            self._alarm_workers.append(asyncio.create_task(self._alarm_worker_loop()))
+    
+    async def _alarm_worker_loop(self):
+        """Run queued alarm checks one at a time."""
+        while True:
+            device_id, sensor_id, value = await self._alarm_queue.get()
+            try:
+                await self._check_alarms(device_id, sensor_id, value)
+            except Exception as e:
+                _LOGGER.error(f"Alarm worker failed for device {device_id}, sensor {sensor_id}: {e}")
+            finally:
+                self._alarm_queue.task_done()
     
     async def _check_alarms(self, device_id: UUID, sensor_id: str, value: Any):
         """Check if any alarms should be triggered."""
-        from app.services.alarm_service import AlarmService
-        from app.services.notification_service import notification_service
-        
         device = self.devices.get(device_id)
         if not device:
             return
         
         # Get sensor config for formatting
-        sensor_config = device['sensor_configs'].get(sensor_id)
+        sensor_config: Optional[SensorConfig] = device['sensor_configs'].get(sensor_id)
         if not sensor_config:
             return
         
-        sensor_name = sensor_config.get('name', sensor_id)
-        unit = sensor_config.get('unit_of_measurement', '')
+        sensor_name = sensor_config.name
+        unit = sensor_config.unit_of_measurement or ''
         
         # Format value for display
         if isinstance(value, (int, float)):
@@ -329,25 +597,31 @@ class DeviceManager:
     def handle_mqtt_message(self, device_serial: str, topic: str, value: Any):
         """Handle MQTT message from BayrolMQTTManager."""
         # Find device by serial
-        for device in self.devices.values():
-            if device['serial'] == device_serial:
-                # Schedule the async handler
-                asyncio.create_task(
-                    self._handle_sensor_update(device['id'], topic, value)
-                )
-                break
+        device_id = self._by_serial.get(device_serial)
+        if device_id is not None:
+            # Schedule the async handler, holding a reference until it finishes
+            task = asyncio.create_task(
+                self._handle_sensor_update(device_id, topic, value)
+            )
+            self._update_tasks.add(task)
+            task.add_done_callback(self._on_update_done)
+    
+    def _on_update_done(self, task: asyncio.Task):
+        """Forget a finished sensor update handler and log its failure, if any."""
+        self._update_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.error(f"Sensor update handler failed: {task.exception()}")
     
     def register_websocket(self, device_id: UUID, websocket: Any):
         """Register a WebSocket connection for a device."""
-        if device_id not in self._websocket_connections:
-            self._websocket_connections[device_id] = []
-        self._websocket_connections[device_id].append(websocket)
+        self._websocket_connections.setdefault(device_id, set()).add(websocket)
     
     def unregister_websocket(self, device_id: UUID, websocket: Any):
         """Unregister a WebSocket connection."""
-        if device_id in self._websocket_connections:
-            self._websocket_connections[device_id].remove(websocket)
-            if not self._websocket_connections[device_id]:
+        connections = self._websocket_connections.get(device_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
                 del self._websocket_connections[device_id]
     
     async def send_select_value(self, device_id: UUID, sensor_id: str, value: str) -> bool:
@@ -356,22 +630,42 @@ class DeviceManager:
         if not device:
             return False
         
-        mqtt_manager = device['mqtt_manager']
-        sensor_config = device['sensor_configs'].get(sensor_id)
+        sensor_config: Optional[SensorConfig] = device['sensor_configs'].get(sensor_id)
         
-        if not sensor_config or sensor_config.get('entity_type') != 'select':
+        if not sensor_config or sensor_config.entity_type != 'select':
             return False
         
         # Get MQTT value to send
-        from app.core.sensor_handler import get_mqtt_value_for_select
         mqtt_value = get_mqtt_value_for_select(device['type'], sensor_id, value)
         
         if mqtt_value:
-            mqtt_manager.publish(sensor_id, mqtt_value)
+            await self._device_mqtt[device_id].publish(sensor_id, mqtt_value)
             return True
         
         return False
     
+    async def send_select_values(self, device_id: UUID, values: Dict[str, str]) -> Dict[str, bool]:
+        """Send several select values to the device in one burst."""
+        device = self.devices.get(device_id)
+        if not device:
+            return {sensor_id: False for sensor_id in values}
+        
+        sensor_configs = device['sensor_configs']
+        results = {}
+        to_publish = []
+        for sensor_id, value in values.items():
+            sensor_config: Optional[SensorConfig] = sensor_configs.get(sensor_id)
+            mqtt_value = None
+            if sensor_config and sensor_config.entity_type == 'select':
+                mqtt_value = get_mqtt_value_for_select(device['type'], sensor_id, value)
+            if mqtt_value:
+                to_publish.append((sensor_id, mqtt_value))
+            results[sensor_id] = bool(mqtt_value)
+        
+        if to_publish:
+            await self._device_mqtt[device_id].publish_many(to_publish)
+        return results
+    
     async def shutdown(self):
         """Shutdown all device connections."""
         _LOGGER.info("Shutting down device manager...")
@@ -380,6 +674,20 @@ class DeviceManager:
         for device_id in list(self.devices.keys()):
             await self.remove_device(device_id)
         
+        # Stop alarm workers; pending checks are dropped
+        for task in self._alarm_workers:
+            task.cancel()
+        await asyncio.gather(*self._alarm_workers, return_exceptions=True)
+        self._alarm_workers = []
+        
+        # Flush queued sensor readings
+        if self._reading_writer and not self._reading_writer.done():
+            self._reading_writer.cancel()
+            try:
+                await self._reading_writer
+            except asyncio.CancelledError:
+                pass
+        
         # Clear all connections
         self._websocket_connections.clear()
         self._sensor_callbacks.clear()
\ No newline at end of file
@@ -1,12 +1,63 @@
 """Sensor value handling logic extracted from Home Assistant."""
 
-from typing import Any, Optional, Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Optional, Dict, Mapping
 import logging
 
-from app.core.const import SensorConfig
+from app.core.const import (
+    VALUE_TO_MQTT_AUTOMATIC,
+    VALUE_TO_MQTT_PM5,
+    SensorConfig,
+    get_sensor_types_for_device,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# MQTT state values and the labels they are shown as
+_STRING_STATES = {
+    "19.18": "On",
+    "19.19": "Off",
+    "19.195": "Auto",
+    "19.115": "Auto Plus",
+    "19.106": "Constant production",
+    "19.177": "On",
+    "19.176": "Off",
+    "19.257": "Missing",
+    "19.258": "Not Empty",
+    "19.259": "Empty",
+}
+_NUMERIC_STATES = {
+    7001: "On",
+    7002: "Off",
+    7521: "Full",
+    7522: "Low",
+    7523: "Empty",
+    7524: "Ok",
+    7525: "Info",
+    7526: "Warning",
+    7527: "Alarm",
+}
+
+# Mapped state values that are shown without a unit
+_STATE_LABELS = frozenset({
+    "On", "Off", "Auto", "Auto Plus", "Constant production",
+    "Missing", "Not Empty", "Empty", "Full", "Low",
+    "Ok", "Info", "Warning", "Alarm",
+})
+
+
+def _state_label(value: Any) -> Optional[str]:
+    """Get the label for an MQTT state value, or None if it isn't one."""
+    if isinstance(value, str):
+        return _STRING_STATES.get(value)
+    if isinstance(value, int):
+        return _NUMERIC_STATES.get(value)
+    if isinstance(value, float):
+        # Float payloads like 19.18 match the string states by their text form
+        return _NUMERIC_STATES.get(value) or _STRING_STATES.get(str(value))
+    return None
+
 
 def handle_sensor_value(sensor_config: SensorConfig, value: Any) -> Any:
     """
@@ -15,64 +66,25 @@ def handle_sensor_value(sensor_config: SensorConfig, value: Any) -> Any:
     This is the core logic extracted from the Home Assistant sensor.py file.
     It processes the raw MQTT values and converts them to human-readable format.
     """
-    # Special string-based value mappings
-    match str(value):
-        case "19.18":
-            return "On"
-        case "19.19":
-            return "Off"
-        case "19.195":
-            return "Auto"
-        case "19.115":
-            return "Auto Plus"
-        case "19.106":
-            return "Constant production"
-        case "19.177":
-            return "On"
-        case "19.176":
-            return "Off"
-        case "19.257":
-            return "Missing"
-        case "19.258":
-            return "Not Empty"
-        case "19.259":
-            return "Empty"
+    # Special value mappings
+    label = _state_label(value)
+    if label is not None:
+        return label
     
-    # Numeric value mappings
-    match value:
-        case 7001:
-            return "On"
-        case 7002:
-            return "Off"
-        case 7521:
-            return "Full"
-        case 7522:
-            return "Low"
-        case 7523:
-            return "Empty"
-        case 7524:
-            return "Ok"
-        case 7525:
-            return "Info"
-        case 7526:
-            return "Warning"
-        case 7527:
-            return "Alarm"
-        case _:
-            # Apply coefficient if available
-            coefficient = sensor_config.get("coefficient")
-            if coefficient is not None and coefficient != -1:
-                try:
-                    return float(value) / coefficient
-                except (ValueError, TypeError, ZeroDivisionError):
-                    _LOGGER.error(f"Failed to apply coefficient {coefficient} to value {value}")
-                    return value
-            elif coefficient == -1:
-                # Treat as string
-                return str(value)
-            else:
-                # Return as-is
-                return value
+    # Apply coefficient if available
+    coefficient = sensor_config.coefficient
+    if coefficient is not None and coefficient != -1:
+        try:
+            return float(value) / coefficient
+        except (ValueError, TypeError, ZeroDivisionError):
+            _LOGGER.error(f"Failed to apply coefficient {coefficient} to value {value}")
+            return value
+    elif coefficient == -1:
+        # Treat as string
+        return str(value)
+    else:
+        # Return as-is
+        return value
 
 
 def format_sensor_value(sensor_config: SensorConfig, value: Any) -> Dict[str, Any]:
@@ -86,12 +98,10 @@ def format_sensor_value(sensor_config: SensorConfig, value: Any) -> Dict[str, An
     - formatted_value: String representation with unit
     """
     processed_value = handle_sensor_value(sensor_config, value)
-    unit = sensor_config.get("unit_of_measurement", "")
+    unit = sensor_config.unit_of_measurement
     
     # Format the value with unit
-    if unit and processed_value not in ["On", "Off", "Auto", "Auto Plus", "Constant production", 
-                                        "Missing", "Not Empty", "Empty", "Full", "Low", 
-                                        "Ok", "Info", "Warning", "Alarm"]:
+    if unit and not (isinstance(processed_value, str) and processed_value in _STATE_LABELS):
         formatted_value = f"{processed_value} {unit}"
     else:
         formatted_value = str(processed_value)
@@ -104,14 +114,65 @@ def format_sensor_value(sensor_config: SensorConfig, value: Any) -> Dict[str, An
     }
 
 
+def build_formatter(sensor_config: SensorConfig) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Build a formatter specialised to one sensor's coefficient and unit.
+    
+    The returned callable gives the same result as
+    ``format_sensor_value(sensor_config, value)``.
+    """
+    coefficient = sensor_config.coefficient
+    unit = sensor_config.unit_of_measurement
+    
+    if coefficient is None:
+        scale = None
+    elif coefficient == -1:
+        # Treat as string
+        scale = str
+    else:
+        def scale(value: Any) -> Any:
+            try:
+                return float(value) / coefficient
+            except (ValueError, TypeError, ZeroDivisionError):
+                _LOGGER.error(f"Failed to apply coefficient {coefficient} to value {value}")
+                return value
+    
+    def format_value(value: Any) -> Dict[str, Any]:
+        label = _state_label(value)
+        if label is not None:
+            # Mapped states are shown without a unit
+            return {"raw_value": value, "value": label, "unit": unit, "formatted_value": label}
+        
+        processed_value = value if scale is None else scale(value)
+        if unit and not (isinstance(processed_value, str) and processed_value in _STATE_LABELS):
+            formatted_value = f"{processed_value} {unit}"
+        else:
+            formatted_value = str(processed_value)
+        return {
+            "raw_value": value,
+            "value": processed_value,
+            "unit": unit,
+            "formatted_value": formatted_value
+        }
+    
+    return format_value
+
+
+@lru_cache(maxsize=16)
+def get_sensor_formatters(device_type: str) -> Mapping[str, Callable[[Any], Dict[str, Any]]]:
+    """Get the formatters for every sensor of a device type (shared by all its devices)."""
+    return MappingProxyType({
+        sensor_id: build_formatter(sensor_config)
+        for sensor_id, sensor_config in get_sensor_types_for_device(device_type).items()
+    })
+
+
 def get_mqtt_value_for_select(device_type: str, sensor_id: str, display_value: str) -> Optional[str]:
     """
     Get the MQTT value to send for a select entity based on display value.
     
     This reverses the value mapping for sending commands back to the device.
     """
-    from app.core.const import VALUE_TO_MQTT_AUTOMATIC, VALUE_TO_MQTT_PM5
-    
     # For Automatic devices (SALT and Cl-pH)
     if device_type in ["Automatic SALT", "Automatic Cl-pH"]:
         return VALUE_TO_MQTT_AUTOMATIC.get(display_value)
@@ -124,7 +185,7 @@ def get_mqtt_value_for_select(device_type: str, sensor_id: str, display_value: s
         # Try to parse as float and multiply by coefficient if needed
         sensor_config = _get_sensor_config_for_id(device_type, sensor_id)
         if sensor_config:
-            coefficient = sensor_config.get("coefficient", 1)
+            coefficient = sensor_config.coefficient
             if coefficient and coefficient != -1:
                 return str(int(float(display_value) * coefficient))
     except (ValueError, TypeError):
@@ -135,7 +196,4 @@ def get_mqtt_value_for_select(device_type: str, sensor_id: str, display_value: s
 
 def _get_sensor_config_for_id(device_type: str, sensor_id: str) -> Optional[SensorConfig]:
     """Get sensor configuration for a specific sensor ID."""
-    from app.core.const import get_sensor_types_for_device
-    
-    sensor_types = get_sensor_types_for_device(device_type)
-    return sensor_types.get(sensor_id)
\ No newline at end of file
+    return get_sensor_types_for_device(device_type).get(sensor_id)
\ No newline at end of file
@@ -1,15 +1,32 @@
 """Database configuration and initialization."""
 
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
+_ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
 # Create async engine
 engine = create_async_engine(
     str(settings.DATABASE_URL),
     echo=False,
-    future=True
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args={
+        # asyncpg's per-connection statement cache and SQLAlchemy's prepared
+        # statement cache, so repeated queries skip parse/plan
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    }
 )
 
 # Create async session factory
@@ -20,17 +37,31 @@ async_session_maker = async_sessionmaker(
 )
 
 # Create base class for models
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base for all models."""
 
 
 async def init_db():
     """Initialize the database."""
     # Import all models here to ensure they are registered
-    from app.models.database import Device, SensorReading, Alarm, ApiKey, AlarmHistory
+    from app.models.database import Device, SensorReading, LatestSensorReading, Alarm, ApiKey, AlarmHistory
     
     async with engine.begin() as conn:
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
+    
+    # TimescaleDB setup lives in the Alembic migrations; a failing
+    # migration aborts startup instead of leaving the schema half set up
+    async with engine.connect() as conn:
+        await conn.run_sync(_run_migrations)
+        await conn.commit()
+
+
+def _run_migrations(connection: Connection):
+    """Upgrade the database to the latest Alembic revision on the given connection."""
+    config = Config(str(_ALEMBIC_INI))
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
 
 
 async def get_db() -> AsyncSession:
@@ -38,5 +69,9 @@ async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         try:
             yield session
+        except Exception:
+            # Release the connection back to the pool before the error propagates
+            await session.rollback()
+            raise
         finally:
             await session.close()
\ No newline at end of file
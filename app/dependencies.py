@@ -1,15 +1,35 @@
 """FastAPI dependencies for dependency injection."""
 
+import hmac
+import uuid
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, status, Header, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.services.auth_service import ApiKeyService
 from app.models.database import ApiKey
 
 
+def _build_master_key() -> Optional[ApiKey]:
+    """Build the virtual ApiKey returned for the master key, if one is configured."""
+    if not settings.MASTER_API_KEY:
+        return None
+    master_key = ApiKey()
+    master_key.id = uuid.UUID('00000000-0000-0000-0000-000000000000')
+    master_key.key = settings.MASTER_API_KEY
+    master_key.name = "Master API Key"
+    master_key.is_active = True
+    master_key.permissions = {"admin": True}
+    return master_key
+
+
+# Built once; handed out read-only to every master-key request
+_MASTER_KEY = _build_master_key()
+
+
 async def get_api_key(
     x_api_key: Annotated[Optional[str], Header()] = None,
     session: AsyncSession = Depends(get_db)
@@ -27,19 +47,11 @@ async def get_api_key(
             headers={"WWW-Authenticate": "ApiKey"},
         )
     
-    # Check if it's the master key
-    from app.config import settings
-    if settings.MASTER_API_KEY and x_api_key == settings.MASTER_API_KEY:
-        # Create a virtual ApiKey object for the master key
-        from app.models.database import ApiKey
-        import uuid
-        master_key = ApiKey()
-        master_key.id = uuid.UUID('00000000-0000-0000-0000-000000000000')
-        master_key.key = x_api_key
-        master_key.name = "Master API Key"
-        master_key.is_active = True
-        master_key.permissions = {"admin": True}
-        return master_key
+    # Check if it's the master key (constant-time comparison)
+    if _MASTER_KEY is not None and hmac.compare_digest(
+        x_api_key.encode(), _MASTER_KEY.key.encode()
+    ):
+        return _MASTER_KEY
     
     # Otherwise validate as regular API key
     api_key = await ApiKeyService.validate_api_key(session, x_api_key)
@@ -61,4 +73,9 @@ DatabaseSession = Annotated[AsyncSession, Depends(get_db)]
 
 def get_device_manager(request: Request):
     """Get device manager from app state."""
-    return request.app.state.device_manager
\ No newline at end of file
+    return request.app.state.device_manager
+
+
+def get_bayrol_http(request: Request):
+    """Get the shared Bayrol API HTTP session from app state."""
+    return request.app.state.bayrol_http
\ No newline at end of file
@@ -2,10 +2,13 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 import asyncio
 
+import aiohttp
+
 from app.config import settings
 from app.api.router import api_router
 from app.database import init_db
@@ -37,13 +40,25 @@ async def lifespan(app: FastAPI):
     # Initialize Redis
     await redis_service.connect()
     
+    # Shared HTTP client for the Bayrol API, keeping TLS connections alive between calls
+    app.state.bayrol_http = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=10),
+        connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300, keepalive_timeout=60)
+    )
+    
+    # Start the batched sensor reading writer and the alarm workers before
+    # devices begin reporting
+    app.state.device_manager.start_reading_writer()
+    app.state.device_manager.start_alarm_workers()
+    
     # Load existing devices from database
     await app.state.device_manager.load_devices_from_db()
     
     # Start background tasks
-    from app.utils.background_tasks import process_alarm_history_task
+    from app.utils.background_tasks import process_alarm_history_task, flush_api_key_last_used_task
     app.state.background_tasks = [
-        asyncio.create_task(process_alarm_history_task())
+        asyncio.create_task(process_alarm_history_task()),
+        asyncio.create_task(flush_api_key_last_used_task())
     ]
     
     yield
@@ -56,22 +71,28 @@ async def lifespan(app: FastAPI):
         task.cancel()
     
     await app.state.device_manager.shutdown()
+    await app.state.bayrol_http.close()
     await redis_service.disconnect()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
+    allow_origins=settings.CORS_ORIGINS,
+    # Credentials are never combined with a wildcard origin
+    allow_credentials="*" not in settings.CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    # History endpoints return the next page's cursor in this header
+    expose_headers=["X-Next-Cursor"],
+    max_age=settings.CORS_MAX_AGE,
 )
 
 # Include API router
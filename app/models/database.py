@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Float, Boolean, Text, ForeignKey, Index, JSON, Integer
+from sqlalchemy import Column, String, DateTime, Float, Boolean, Text, ForeignKey, Index, JSON, Integer, func, table, column, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -25,8 +25,8 @@ class Device(Base):
     client_id = Column(String(100), nullable=True, index=True)  # Custom client identifier
     is_active = Column(Boolean, default=True)
     device_metadata = Column(JSON, nullable=True)  # Store additional device info
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     
     # Relationships
     sensor_readings = relationship("SensorReading", back_populates="device", cascade="all, delete-orphan")
@@ -38,13 +38,24 @@ class SensorReading(Base):
     
     __tablename__ = "sensor_readings"
     __table_args__ = (
-        Index('idx_device_sensor_time', 'device_id', 'sensor_type', 'time'),
+        # Covers the device / sensor_type / time range filters of history and export
+        Index(
+            'ix_sr_dev_type_time', 'device_id', 'sensor_type', text('time DESC'),
+            postgresql_include=['sensor_name', 'value', 'formatted_value', 'unit']
+        ),
+        # Compact index for the append-only time dimension
+        Index(
+            'ix_sr_time_brin', 'time',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        ),
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    time = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
-    device_id = Column(UUID(as_uuid=True), ForeignKey('devices.id'), nullable=False)
-    sensor_type = Column(String(50), nullable=False, index=True)
+    # Part of the primary key: hypertable unique constraints must include
+    # every partitioning column (time, and device_id as the space dimension)
+    time = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    device_id = Column(UUID(as_uuid=True), ForeignKey('devices.id'), primary_key=True)
+    sensor_type = Column(String(50), nullable=False)
     sensor_name = Column(String(255), nullable=True)
     raw_value = Column(Float, nullable=True)
     value = Column(Text, nullable=True)
@@ -55,10 +66,62 @@ class SensorReading(Base):
     device = relationship("Device", back_populates="sensor_readings")
 
 
+class LatestSensorReading(Base):
+    """Most recent reading per device and sensor type, upserted by the readings writer."""
+    
+    __tablename__ = "latest_sensor_readings"
+    
+    device_id = Column(UUID(as_uuid=True), ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True)
+    sensor_type = Column(String(50), primary_key=True)
+    time = Column(DateTime, nullable=False)
+    sensor_name = Column(String(255), nullable=True)
+    raw_value = Column(Float, nullable=True)
+    value = Column(Text, nullable=True)
+    formatted_value = Column(Text, nullable=True)
+    unit = Column(String(50), nullable=True)
+
+
+# TimescaleDB continuous aggregates over sensor_readings, keyed by the history
+# aggregation parameter: (view name, bucket width, refresh window). The views
+# are created by migration 0003; keep the two in sync
+SENSOR_AGGREGATES = {
+    "1min": ("sensor_readings_1min", "1 minute", "1 hour"),
+    "5min": ("sensor_readings_5min", "5 minutes", "6 hours"),
+    "15min": ("sensor_readings_15min", "15 minutes", "1 day"),
+    "1hour": ("sensor_readings_1hour", "1 hour", "7 days"),
+    "1day": ("sensor_readings_1day", "1 day", "30 days"),
+}
+
+
+def _sensor_aggregate_view(name: str):
+    """Lightweight table construct for selecting from a sensor continuous aggregate."""
+    return table(
+        name,
+        column("bucket", DateTime),
+        column("device_id", UUID(as_uuid=True)),
+        column("sensor_type", String),
+        column("sensor_name", String),
+        column("value", Float),
+        column("formatted_value", Text),
+        column("unit", String),
+    )
+
+
+SENSOR_AGGREGATE_VIEWS = {
+    aggregation: _sensor_aggregate_view(view)
+    for aggregation, (view, _, _) in SENSOR_AGGREGATES.items()
+}
+
+
 class Alarm(Base):
     """Alarm configuration for monitoring sensor values."""
     
     __tablename__ = "alarms"
+    __table_args__ = (
+        # Alarm lookups only ever read enabled rows, so the index skips disabled ones
+        Index('ix_alarms_active_device_sensor', 'device_id', 'sensor_type',
+              postgresql_where=text('enabled = TRUE')),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     device_id = Column(UUID(as_uuid=True), ForeignKey('devices.id'), nullable=False)
@@ -72,8 +135,8 @@ class Alarm(Base):
     email = Column(String(255), nullable=True)
     cooldown_minutes = Column(Integer, default=60)  # Prevent spam
     last_triggered = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     
     # Relationship
     device = relationship("Device", back_populates="alarms")
@@ -101,6 +164,12 @@ class AlarmHistory(Base):
     __tablename__ = "alarm_history"
     __table_args__ = (
         Index('idx_alarm_device_time', 'alarm_id', 'device_id', 'triggered_at'),
+        # History queries filter by alarm or device and ORDER BY triggered_at DESC, id DESC
+        # LIMIT n; these let the planner walk the index backwards and stop after n rows
+        Index('ix_alarm_history_alarm_triggered', 'alarm_id', 'triggered_at', 'id',
+              postgresql_using='btree'),
+        Index('ix_alarm_history_device_triggered', 'device_id', 'triggered_at', 'id',
+              postgresql_using='btree', postgresql_include=['sensor_type']),
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -111,7 +180,8 @@ class AlarmHistory(Base):
     sensor_value = Column(Float, nullable=False)
     formatted_value = Column(String(255), nullable=True)
     condition_met = Column(String(50), nullable=False)  # e.g., "pH 6.5 < 7.0 (below threshold)"
-    triggered_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Part of the primary key: alarm_history is a hypertable partitioned on triggered_at
+    triggered_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     # Notification status
     notification_sent = Column(Boolean, default=False)
@@ -125,9 +195,4 @@ class AlarmHistory(Base):
 
 
 # Update Alarm model to include relationship
-Alarm.history = relationship("AlarmHistory", back_populates="alarm", cascade="all, delete-orphan", order_by="AlarmHistory.triggered_at.desc()")
-
-
-# Note: For TimescaleDB, you would create a hypertable for sensor_readings
-# This would be done in a migration script:
-# SELECT create_hypertable('sensor_readings', 'time');
\ No newline at end of file
+Alarm.history = relationship("AlarmHistory", back_populates="alarm", cascade="all, delete-orphan", order_by="AlarmHistory.triggered_at.desc()")
\ No newline at end of file
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, validator
 
 
 # Device schemas
@@ -40,8 +40,7 @@ class DeviceResponse(DeviceBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DeviceDetailResponse(DeviceResponse):
@@ -136,8 +135,7 @@ class AlarmResponse(AlarmBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # WebSocket schemas
@@ -167,8 +165,7 @@ class ApiKeyResponse(BaseModel):
     created_at: datetime
     expires_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Alarm History schemas
@@ -189,8 +186,7 @@ class AlarmHistoryResponse(BaseModel):
     notification_types: Optional[List[str]] = []
     notification_results: Optional[Dict[str, Any]] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Error schemas
@@ -1,17 +1,19 @@
 """Alarm service for monitoring sensor values and triggering notifications."""
 
+import asyncio
 import logging
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, and_, or_, func, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.database import Alarm, AlarmHistory, Device
 from app.services.redis_service import redis_service
 from app.database import async_session_maker
+from app.config import settings
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,62 +21,6 @@ _LOGGER = logging.getLogger(__name__)
 class AlarmService:
     """Service for checking alarm conditions and managing notifications."""
     
-    @staticmethod
-    async def get_active_alarms_for_device(
-        device_id: UUID,
-        sensor_type: Optional[str] = None,
-        use_cache: bool = True
-    ) -> List[Alarm]:
-        """
-        Get active alarms for a device, optionally filtered by sensor type.
-        
-        Uses Redis cache when available to reduce database queries.
-        """
-        # Try cache first
-        if use_cache:
-            cached_alarms = await redis_service.get_device_alarms(str(device_id))
-            if cached_alarms is not None:
-                # Filter by sensor type if specified
-                if sensor_type:
-                    return [a for a in cached_alarms if a.get('sensor_type') == sensor_type]
-                return cached_alarms
-        
-        # Fetch from database
-        async with async_session_maker() as session:
-            query = select(Alarm).where(
-                and_(
-                    Alarm.device_id == device_id,
-                    Alarm.enabled == True
-                )
-            )
-            
-            if sensor_type:
-                query = query.where(Alarm.sensor_type == sensor_type)
-            
-            result = await session.execute(query)
-            alarms = result.scalars().all()
-            
-            # Cache all device alarms
-            if use_cache and not sensor_type:
-                alarm_dicts = [
-                    {
-                        'id': str(alarm.id),
-                        'sensor_type': alarm.sensor_type,
-                        'name': alarm.name,
-                        'condition': alarm.condition,
-                        'threshold_min': alarm.threshold_min,
-                        'threshold_max': alarm.threshold_max,
-                        'cooldown_minutes': alarm.cooldown_minutes,
-                        'last_triggered': alarm.last_triggered.isoformat() if alarm.last_triggered else None,
-                        'webhook_url': alarm.webhook_url,
-                        'email': alarm.email
-                    }
-                    for alarm in alarms
-                ]
-                await redis_service.cache_device_alarms(str(device_id), alarm_dicts, ttl=300)
-            
-            return alarms
-    
     @staticmethod
     async def check_alarm_conditions(
         device_id: UUID,
@@ -88,52 +34,49 @@ class AlarmService:
         
         Returns list of (alarm, condition_description) tuples for triggered alarms.
         """
-        # Get active alarms for this sensor
-        alarms = await AlarmService.get_active_alarms_for_device(device_id, sensor_type)
+        # Let the database return only the alarms that fire: enabled, out of
+        # cooldown and matching their condition (timestamps are naive UTC)
+        now = func.timezone('UTC', func.now())
+        cooldown = func.make_interval(0, 0, 0, 0, 0, func.coalesce(Alarm.cooldown_minutes, 0))
+        query = select(Alarm).where(
+            Alarm.device_id == device_id,
+            Alarm.sensor_type == sensor_type,
+            Alarm.enabled == True,
+            or_(
+                Alarm.last_triggered.is_(None),
+                Alarm.last_triggered + cooldown <= now
+            ),
+            or_(
+                and_(Alarm.condition == "above", Alarm.threshold_max < value),
+                and_(Alarm.condition == "below", Alarm.threshold_min > value),
+                and_(Alarm.condition == "equals", Alarm.threshold_min == value),
+                and_(
+                    Alarm.condition == "out_of_range",
+                    Alarm.threshold_min.is_not(None),
+                    Alarm.threshold_max.is_not(None),
+                    or_(Alarm.threshold_min > value, Alarm.threshold_max < value)
+                )
+            )
+        )
         
-        if not alarms:
-            return []
+        async with async_session_maker() as session:
+            result = await session.execute(query)
+            alarms = result.scalars().all()
         
         triggered_alarms = []
         
         for alarm in alarms:
-            # Check cooldown
-            if alarm.last_triggered:
-                cooldown_until = alarm.last_triggered + timedelta(minutes=alarm.cooldown_minutes)
-                if datetime.utcnow() < cooldown_until:
-                    _LOGGER.debug(
-                        f"Alarm {alarm.id} for {sensor_type} is in cooldown until {cooldown_until}"
-                    )
-                    continue
-            
-            # Check conditions
-            condition_met = False
-            condition_desc = ""
-            
-            if alarm.condition == "above" and alarm.threshold_max is not None:
-                if value > alarm.threshold_max:
-                    condition_met = True
-                    condition_desc = f"{sensor_name} {formatted_value} > {alarm.threshold_max} (above threshold)"
+            if alarm.condition == "above":
+                condition_desc = f"{sensor_name} {formatted_value} > {alarm.threshold_max} (above threshold)"
+            elif alarm.condition == "below":
+                condition_desc = f"{sensor_name} {formatted_value} < {alarm.threshold_min} (below threshold)"
+            elif alarm.condition == "equals":
+                condition_desc = f"{sensor_name} {formatted_value} = {alarm.threshold_min} (equals threshold)"
+            else:
+                condition_desc = f"{sensor_name} {formatted_value} outside range [{alarm.threshold_min}, {alarm.threshold_max}]"
             
-            elif alarm.condition == "below" and alarm.threshold_min is not None:
-                if value < alarm.threshold_min:
-                    condition_met = True
-                    condition_desc = f"{sensor_name} {formatted_value} < {alarm.threshold_min} (below threshold)"
-            
-            elif alarm.condition == "equals" and alarm.threshold_min is not None:
-                if value == alarm.threshold_min:
-                    condition_met = True
-                    condition_desc = f"{sensor_name} {formatted_value} = {alarm.threshold_min} (equals threshold)"
-            
-            elif alarm.condition == "out_of_range":
-                if alarm.threshold_min is not None and alarm.threshold_max is not None:
-                    if value < alarm.threshold_min or value > alarm.threshold_max:
-                        condition_met = True
-                        condition_desc = f"{sensor_name} {formatted_value} outside range [{alarm.threshold_min}, {alarm.threshold_max}]"
-            
-            if condition_met:
-                triggered_alarms.append((alarm, condition_desc))
-                _LOGGER.info(f"Alarm triggered: {alarm.name} - {condition_desc}")
+            triggered_alarms.append((alarm, condition_desc))
+            _LOGGER.info(f"Alarm triggered: {alarm.name} - {condition_desc}")
         
         return triggered_alarms
     
@@ -197,7 +140,6 @@ class AlarmService:
                     alarm_db.last_triggered = datetime.utcnow()
                 
                 await session.commit()
-                await session.refresh(history)
                 
                 # Invalidate cache
                 await redis_service.invalidate_device_alarms(str(device_id))
@@ -205,76 +147,79 @@ class AlarmService:
                 return history
     
     @staticmethod
-    async def process_alarm_history_batch():
+    async def process_alarm_history_batch(batch_size: Optional[int] = None,
+                                          max_batches: Optional[int] = None):
         """
-        Process batch of alarm history from Redis queue.
+        Drain alarm history from the Redis queue in batches.
         
-        This should be called periodically by a background task.
+        This should be called periodically by a background task. Batches of
+        batch_size items are written until the queue is empty or max_batches
+        have been processed.
         """
-        batch = await redis_service.get_alarm_history_batch(batch_size=100)
-        
-        if not batch:
-            return 0
+        batch_size = batch_size or settings.ALARM_HISTORY_BATCH_SIZE
+        alarms = Alarm.__table__
+        processed = 0
+        batches = 0
+        affected_devices = set()
         
         async with async_session_maker() as session:
-            # Create history records
-            for item in batch:
-                history = AlarmHistory(
-                    alarm_id=UUID(item['alarm_id']),
-                    device_id=UUID(item['device_id']),
-                    sensor_type=item['sensor_type'],
-                    sensor_name=item.get('sensor_name'),
-                    sensor_value=item['sensor_value'],
-                    formatted_value=item.get('formatted_value'),
-                    condition_met=item['condition_met'],
-                    triggered_at=datetime.fromisoformat(item['triggered_at']),
-                    notification_sent=item.get('notification_sent', False),
-                    notification_types=item.get('notification_types', []),
-                    notification_results=item.get('notification_results'),
-                    notification_errors=item.get('notification_errors')
-                )
-                session.add(history)
+            while max_batches is None or batches < max_batches:
+                batch = await redis_service.get_alarm_history_batch(batch_size=batch_size)
+                if not batch:
+                    break
                 
-                # Update alarm last_triggered
-                alarm = await session.get(Alarm, UUID(item['alarm_id']))
-                if alarm:
-                    alarm.last_triggered = datetime.fromisoformat(item['triggered_at'])
-            
-            await session.commit()
-            
-            # Invalidate caches for affected devices
-            unique_devices = set(item['device_id'] for item in batch)
-            for device_id in unique_devices:
-                await redis_service.invalidate_device_alarms(device_id)
+                rows = []
+                last_triggered = {}  # alarm_id -> latest triggered_at in this batch
+                for item in batch:
+                    alarm_id = UUID(item['alarm_id'])
+                    triggered_at = datetime.fromisoformat(item['triggered_at'])
+                    rows.append({
+                        'id': uuid.uuid4(),
+                        'alarm_id': alarm_id,
+                        'device_id': UUID(item['device_id']),
+                        'sensor_type': item['sensor_type'],
+                        'sensor_name': item.get('sensor_name'),
+                        'sensor_value': item['sensor_value'],
+                        'formatted_value': item.get('formatted_value'),
+                        'condition_met': item['condition_met'],
+                        'triggered_at': triggered_at,
+                        'notification_sent': item.get('notification_sent', False),
+                        'notification_types': item.get('notification_types', []),
+                        'notification_results': item.get('notification_results'),
+                        'notification_errors': item.get('notification_errors')
+                    })
+                    last_triggered[alarm_id] = triggered_at
+                    affected_devices.add(item['device_id'])
+                
+                # One transaction per batch: executemany INSERT for the history rows
+                # and an executemany UPDATE of last_triggered, without ORM objects
+                async with session.begin():
+                    await session.execute(insert(AlarmHistory.__table__), rows)
+                    await session.execute(
+                        update(alarms)
+                        .where(alarms.c.id == bindparam('b_alarm_id'))
+                        .values(last_triggered=bindparam('b_triggered_at')),
+                        [
+                            {'b_alarm_id': alarm_id, 'b_triggered_at': triggered_at}
+                            for alarm_id, triggered_at in last_triggered.items()
+                        ]
+                    )
+                
+                processed += len(batch)
+                batches += 1
+                
+                # A short batch means the queue is drained
+                if len(batch) < batch_size:
+                    break
         
-        _LOGGER.info(f"Processed {len(batch)} alarm history records")
-        return len(batch)
-    
-    @staticmethod
-    async def get_alarm_history(
-        alarm_id: Optional[UUID] = None,
-        device_id: Optional[UUID] = None,
-        start_time: Optional[datetime] = None,
-        end_time: Optional[datetime] = None,
-        limit: int = 100
-    ) -> List[AlarmHistory]:
-        """Get alarm history with filters."""
-        async with async_session_maker() as session:
-            query = select(AlarmHistory).options(
-                selectinload(AlarmHistory.alarm),
-                selectinload(AlarmHistory.device)
-            )
-            
-            if alarm_id:
-                query = query.where(AlarmHistory.alarm_id == alarm_id)
-            if device_id:
-                query = query.where(AlarmHistory.device_id == device_id)
-            if start_time:
-                query = query.where(AlarmHistory.triggered_at >= start_time)
-            if end_time:
-                query = query.where(AlarmHistory.triggered_at <= end_time)
-            
-            query = query.order_by(AlarmHistory.triggered_at.desc()).limit(limit)
-            
-            result = await session.execute(query)
-            return result.scalars().all()
\ No newline at end of file
+        if not processed:
+            return 0
+        
+        # Invalidate caches once per affected device
+        await asyncio.gather(*(
+            redis_service.invalidate_device_alarms(device_id)
+            for device_id in affected_devices
+        ))
+        
+        _LOGGER.info(f"Processed {processed} alarm history records")
+        return processed
@@ -1,31 +1,45 @@
 """Authentication service for Bayrol API integration."""
 
+import hashlib
 import json
 import logging
 import secrets
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
 import aiohttp
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
 
 from app.config import settings
+from app.database import async_session_maker
 from app.models.database import ApiKey
+from app.services.redis_service import redis_service
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds a validated API key is served from Redis before hitting the database again
+API_KEY_CACHE_TTL = 60
+
+
+def _api_key_cache_key(key: str) -> str:
+    """Redis key for a cached API key validation (the raw key is never stored)."""
+    return f"apikey:{hashlib.sha256(key.encode()).hexdigest()}"
+
 
 class BayrolAuthService:
     """Service for authenticating with Bayrol API and getting device credentials."""
     
     @staticmethod
-    async def get_device_credentials(app_link_code: str) -> Dict[str, Any]:
+    async def get_device_credentials(app_link_code: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
         """
         Get device credentials from Bayrol API using app link code.
         
         Args:
             app_link_code: 8-character code from Bayrol app
+            session: Shared HTTP session for the Bayrol API
             
         Returns:
             Dict containing accessToken and deviceSerial
@@ -39,59 +53,58 @@ class BayrolAuthService:
         
         url = f"{settings.BAYROL_API_URL}?code={app_link_code}"
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url) as response:
-                    # Get response text regardless of status code (like original HA code)
-                    data = await response.text()
-                    
-                    # Parse JSON response
-                    try:
-                        data_json = json.loads(data)
-                    except json.JSONDecodeError as e:
-                        _LOGGER.error(f"Failed to parse Bayrol API response (HTTP {response.status}): {data}")
-                        if response.status == 401:
-                            raise ValueError("Invalid or expired app link code")
-                        else:
-                            raise ValueError("Invalid response from Bayrol API")
-                    
-                    # Check for error in response even if HTTP status is not error
-                    if response.status != 200:
-                        _LOGGER.error(f"Bayrol API returned HTTP {response.status}: {data_json}")
-                        if response.status == 401:
-                            raise ValueError("Invalid or expired app link code")
-                        else:
-                            raise ValueError(f"Bayrol API error: HTTP {response.status}")
-                    
-                    # Extract required fields
-                    access_token = data_json.get("accessToken")
-                    device_serial = data_json.get("deviceSerial")
-                    
-                    if not access_token or not device_serial:
-                        _LOGGER.error(f"Missing required fields in API response: {data_json}")
-                        # Check if response contains error message
-                        if "error" in data_json:
-                            raise ValueError(f"Bayrol API error: {data_json['error']}")
-                        else:
-                            raise ValueError("Invalid app link code - no device credentials returned")
-                    
-                    _LOGGER.info(f"Successfully retrieved credentials for device {device_serial}")
-                    
-                    return {
-                        "access_token": access_token,
-                        "device_serial": device_serial,
-                        "raw_response": data_json  # Include full response for debugging
-                    }
-                    
-            except aiohttp.ClientError as e:
-                _LOGGER.error(f"Failed to connect to Bayrol API: {e}")
-                raise ValueError(f"Network error connecting to Bayrol API: {str(e)}")
-            except ValueError:
-                # Re-raise ValueError as is
-                raise
-            except Exception as e:
-                _LOGGER.error(f"Unexpected error getting device credentials: {e}")
-                raise ValueError(f"Unexpected error: {str(e)}")
+        try:
+            async with session.get(url) as response:
+                # Get response body regardless of status code (like original HA code)
+                data = await response.read()
+                
+                # Parse JSON response
+                try:
+                    data_json = orjson.loads(data)
+                except orjson.JSONDecodeError as e:
+                    _LOGGER.error(f"Failed to parse Bayrol API response (HTTP {response.status}): {data.decode(errors='replace')}")
+                    if response.status == 401:
+                        raise ValueError("Invalid or expired app link code")
+                    else:
+                        raise ValueError("Invalid response from Bayrol API")
+                
+                # Check for error in response even if HTTP status is not error
+                if response.status != 200:
+                    _LOGGER.error(f"Bayrol API returned HTTP {response.status}: {data_json}")
+                    if response.status == 401:
+                        raise ValueError("Invalid or expired app link code")
+                    else:
+                        raise ValueError(f"Bayrol API error: HTTP {response.status}")
+                
+                # Extract required fields
+                access_token = data_json.get("accessToken")
+                device_serial = data_json.get("deviceSerial")
+                
+                if not access_token or not device_serial:
+                    _LOGGER.error(f"Missing required fields in API response: {data_json}")
+                    # Check if response contains error message
+                    if "error" in data_json:
+                        raise ValueError(f"Bayrol API error: {data_json['error']}")
+                    else:
+                        raise ValueError("Invalid app link code - no device credentials returned")
+                
+                _LOGGER.info(f"Successfully retrieved credentials for device {device_serial}")
+                
+                return {
+                    "access_token": access_token,
+                    "device_serial": device_serial,
+                    "raw_response": data_json  # Include full response for debugging
+                }
+                
+        except aiohttp.ClientError as e:
+            _LOGGER.error(f"Failed to connect to Bayrol API: {e}")
+            raise ValueError(f"Network error connecting to Bayrol API: {str(e)}")
+        except ValueError:
+            # Re-raise ValueError as is
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Unexpected error getting device credentials: {e}")
+            raise ValueError(f"Unexpected error: {str(e)}")
 
 
 class ApiKeyService:
@@ -121,7 +134,6 @@ class ApiKeyService:
         
         session.add(api_key)
         await session.commit()
-        await session.refresh(api_key)
         
         _LOGGER.info(f"Created API key '{name}' with ID {api_key.id}")
         
@@ -132,8 +144,28 @@ class ApiKeyService:
         """
         Validate an API key and return the key object if valid.
         
-        Also updates the last_used timestamp.
+        Valid keys are cached in Redis for up to API_KEY_CACHE_TTL seconds.
+        last_used is recorded whenever the database is consulted and written
+        in bulk by flush_last_used, so validation itself never writes.
         """
+        cache_key = _api_key_cache_key(key)
+        cached = await redis_service.get(cache_key)
+        if cached:
+            try:
+                data = json.loads(cached)
+                expires_at = datetime.fromisoformat(data["expires_at"]) if data["expires_at"] else None
+                if not expires_at or expires_at >= datetime.utcnow():
+                    return ApiKey(
+                        id=uuid.UUID(data["id"]),
+                        key=key,
+                        name=data["name"],
+                        is_active=True,
+                        permissions=data["permissions"],
+                        expires_at=expires_at
+                    )
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                _LOGGER.warning("Invalid cached API key entry")
+        
         result = await session.execute(
             select(ApiKey).where(
                 ApiKey.key == key,
@@ -150,12 +182,50 @@ class ApiKeyService:
             _LOGGER.warning(f"API key {api_key.id} has expired")
             return None
         
-        # Update last used
-        api_key.last_used = datetime.utcnow()
-        await session.commit()
+        # Record the use; a background task writes last_used in batches
+        await redis_service.record_api_key_use(str(api_key.id), datetime.utcnow())
+        
+        # Cache the validation, but never past the key's expiry
+        ttl = API_KEY_CACHE_TTL
+        if api_key.expires_at:
+            ttl = min(ttl, int((api_key.expires_at - datetime.utcnow()).total_seconds()))
+        if ttl > 0:
+            await redis_service.set(cache_key, {
+                "id": str(api_key.id),
+                "name": api_key.name,
+                "permissions": api_key.permissions,
+                "expires_at": api_key.expires_at.isoformat() if api_key.expires_at else None
+            }, ttl)
         
         return api_key
     
+    @staticmethod
+    async def flush_last_used() -> int:
+        """
+        Write pending last_used timestamps to the database.
+        
+        This should be called periodically by a background task.
+        """
+        uses = await redis_service.pop_api_key_uses()
+        if not uses:
+            return 0
+        
+        # One executemany UPDATE for every key used since the last flush
+        api_keys = ApiKey.__table__
+        async with async_session_maker() as session:
+            async with session.begin():
+                await session.execute(
+                    update(api_keys)
+                    .where(api_keys.c.id == bindparam('b_key_id'))
+                    .values(last_used=bindparam('b_used_at')),
+                    [
+                        {'b_key_id': uuid.UUID(key_id), 'b_used_at': datetime.fromisoformat(used_at)}
+                        for key_id, used_at in uses.items()
+                    ]
+                )
+        
+        return len(uses)
+    
     @staticmethod
     async def revoke_api_key(session: AsyncSession, key_id: str) -> bool:
         """Revoke an API key."""
@@ -169,6 +239,7 @@ class ApiKeyService:
         
         api_key.is_active = False
         await session.commit()
+        await redis_service.delete(_api_key_cache_key(api_key.key))
         
         _LOGGER.info(f"Revoked API key {api_key.id}")
         
@@ -0,0 +1,44 @@
+"""Device service for cached device lookups."""
+
+from typing import Optional, Dict, Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import Device
+from app.services.redis_service import redis_service
+
+
+class DeviceService:
+    """Service for device lookups on hot request paths."""
+    
+    @staticmethod
+    async def get_device_meta(
+        session: AsyncSession,
+        device_id: UUID
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get basic device metadata (serial, name, type), or None if the device doesn't exist.
+        
+        Served from Redis when cached, so existence checks skip the database.
+        """
+        cached = await redis_service.get_device_meta(str(device_id))
+        if cached is not None:
+            return cached
+        
+        result = await session.execute(
+            select(Device.device_id, Device.name, Device.device_type)
+            .where(Device.id == device_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        meta = {
+            "device_id": row.device_id,
+            "name": row.name,
+            "device_type": row.device_type
+        }
+        await redis_service.cache_device_meta(str(device_id), meta)
+        return meta
@@ -3,10 +3,11 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, Set
 from uuid import UUID
 
 import aiohttp
+import orjson
 from aiohttp import ClientTimeout
 
 from app.config import settings
@@ -204,7 +205,7 @@ class NotificationService:
         alarm: Alarm,
         sensor_data: Dict[str, Any],
         condition_description: str,
-        websocket_connections: Dict[UUID, List[Any]]
+        websocket_connections: Dict[UUID, Set[Any]]
     ):
         """Send alarm notification via WebSocket to connected clients."""
         if device_id not in websocket_connections:
@@ -226,18 +227,24 @@ class NotificationService:
             }
         }
         
-        # Send to all connected WebSocket clients for this device
+        # Encode once and send the same text frame to every connected client
+        payload = orjson.dumps(message).decode()
+        sockets = tuple(websocket_connections[device_id])
+        results = await asyncio.gather(
+            *(ws.send_text(payload) for ws in sockets),
+            return_exceptions=True
+        )
+        
         disconnected = []
-        for ws in websocket_connections[device_id]:
-            try:
-                await ws.send_json(message)
-            except Exception as e:
-                _LOGGER.error(f"Failed to send WebSocket alarm notification: {e}")
+        for ws, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                _LOGGER.error(f"Failed to send WebSocket alarm notification: {result}")
                 disconnected.append(ws)
         
-        # Remove disconnected clients
-        for ws in disconnected:
-            websocket_connections[device_id].remove(ws)
+        # Remove disconnected clients (the set may have been dropped meanwhile)
+        connections = websocket_connections.get(device_id)
+        if connections is not None:
+            connections.difference_update(disconnected)
     
     def _determine_severity(self, alarm: Alarm, value: float) -> str:
         """
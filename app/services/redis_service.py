@@ -1,11 +1,14 @@
 """Redis service for caching and queue management."""
 
+import asyncio
 import json
 import logging
-from typing import Any, Optional, List, Dict
-from datetime import timedelta
+import time
+from typing import Any, Awaitable, Callable, Optional, List, Dict, Set, Tuple
+from datetime import datetime, timedelta
 
 import redis.asyncio as redis
+from redis.exceptions import WatchError
 from redis.asyncio.connection import ConnectionPool
 
 from app.config import settings
@@ -20,6 +23,7 @@ class RedisService:
         """Initialize Redis service."""
         self.pool: Optional[ConnectionPool] = None
         self.client: Optional[redis.Redis] = None
+        self._background_tasks: Set[asyncio.Task] = set()  # running SWR refreshes
         
     async def connect(self):
         """Connect to Redis."""
@@ -73,6 +77,13 @@ class RedisService:
         except Exception as e:
             _LOGGER.error(f"Redis DELETE error for key {key}: {e}")
     
+    async def unlink(self, *keys: str):
+        """Delete keys from cache in one round-trip, reclaiming memory asynchronously."""
+        try:
+            await self.client.unlink(*keys)
+        except Exception as e:
+            _LOGGER.error(f"Redis UNLINK error for keys {keys}: {e}")
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists."""
         try:
@@ -81,6 +92,105 @@ class RedisService:
             _LOGGER.error(f"Redis EXISTS error for key {key}: {e}")
             return False
     
+    async def get_or_set_swr(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        stale_ttl: int = 60
+    ) -> Any:
+        """
+        Get a JSON value using stale-while-revalidate semantics.
+        
+        Values younger than ``ttl`` seconds are returned as-is. Values up to
+        ``stale_ttl`` seconds past that are still returned, while a single
+        background refresh is scheduled. On a miss the factory is awaited
+        inline. ``None`` results from the factory are not cached, and neither
+        are results computed across an ``invalidate_swr`` of the key.
+        """
+        cached = await self.get(key)
+        if cached:
+            try:
+                entry = json.loads(cached)
+                if time.time() - entry["t"] > ttl:
+                    # Stale: serve it, but let one caller refresh in the background
+                    if await self._acquire_refresh_lock(key, stale_ttl):
+                        task = asyncio.create_task(self._refresh_swr(key, factory, ttl, stale_ttl))
+                        self._background_tasks.add(task)
+                        task.add_done_callback(self._background_tasks.discard)
+                return entry["v"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                _LOGGER.warning(f"Invalid SWR cache entry for key {key}")
+        
+        generation = await self.get(f"gen:{key}")
+        value = await factory()
+        if value is not None:
+            await self._store_swr(key, value, ttl, stale_ttl, generation)
+        return value
+    
+    async def _store_swr(self, key: str, value: Any, ttl: int, stale_ttl: int,
+                         generation: Optional[str]):
+        """
+        Store a value with its creation time for SWR reads.
+        
+        The write is skipped if the key's generation moved past ``generation``
+        (read before the value was computed), so a computation that raced an
+        invalidation never writes the old value back.
+        """
+        gen_key = f"gen:{key}"
+        payload = json.dumps({"v": value, "t": time.time()})
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(gen_key)
+                if await pipe.get(gen_key) != generation:
+                    return
+                pipe.multi()
+                pipe.setex(key, ttl + stale_ttl, payload)
+                await pipe.execute()
+        except WatchError:
+            _LOGGER.debug(f"SWR entry {key} invalidated while computing, not stored")
+        except Exception as e:
+            _LOGGER.error(f"Redis SWR store error for key {key}: {e}")
+    
+    async def invalidate_swr(self, *keys: str):
+        """Drop SWR entries and bump their generation so in-flight computations are discarded."""
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.incr(f"gen:{key}")
+                    # Only needs to outlive a computation, not the entry itself
+                    pipe.expire(f"gen:{key}", 3600)
+                pipe.unlink(*keys)
+                await pipe.execute()
+        except Exception as e:
+            _LOGGER.error(f"Redis SWR invalidation error for keys {keys}: {e}")
+    
+    async def _acquire_refresh_lock(self, key: str, timeout: int) -> bool:
+        """Take the per-key refresh lock so only one refresh runs at a time."""
+        try:
+            return bool(await self.client.set(f"lock:{key}", 1, nx=True, ex=timeout))
+        except Exception as e:
+            _LOGGER.error(f"Redis lock error for key {key}: {e}")
+            return False
+    
+    async def _refresh_swr(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int
+    ):
+        """Recompute a stale SWR entry in the background."""
+        try:
+            generation = await self.get(f"gen:{key}")
+            value = await factory()
+            if value is not None:
+                await self._store_swr(key, value, ttl, stale_ttl, generation)
+        except Exception as e:
+            _LOGGER.error(f"SWR refresh failed for key {key}: {e}")
+        finally:
+            await self.delete(f"lock:{key}")
+    
     # Hash operations for complex data
     async def hget(self, key: str, field: str) -> Optional[str]:
         """Get field from hash."""
@@ -128,10 +238,10 @@ class RedisService:
         except Exception as e:
             _LOGGER.error(f"Redis LPUSH error for key {key}: {e}")
     
-    async def rpop(self, key: str) -> Optional[str]:
-        """Pop value from the right of list."""
+    async def rpop(self, key: str, count: Optional[int] = None) -> Optional[Any]:
+        """Pop value from the right of list, or a list of up to count values."""
         try:
-            return await self.client.rpop(key)
+            return await self.client.rpop(key, count)
         except Exception as e:
             _LOGGER.error(f"Redis RPOP error for key {key}: {e}")
             return None
@@ -145,32 +255,110 @@ class RedisService:
             return 0
     
     # Alarm-specific cache methods
-    async def cache_device_alarms(self, device_id: str, alarms: List[Dict[str, Any]], ttl: int = 300):
-        """Cache active alarms for a device (5 minutes default TTL)."""
+    async def invalidate_device_alarms(self, device_id: str):
+        """Invalidate alarm cache for a device."""
         key = f"alarms:device:{device_id}"
-        await self.set(key, alarms, ttl)
+        # Cached alarm listings (see list_device_alarms) are SWR entries
+        await self.invalidate_swr(
+            f"{key}:enabled=True",
+            f"{key}:enabled=False"
+        )
     
-    async def get_device_alarms(self, device_id: str) -> Optional[List[Dict[str, Any]]]:
-        """Get cached alarms for a device."""
-        key = f"alarms:device:{device_id}"
-        data = await self.get(key)
-        if data:
+    # Device-specific cache methods
+    async def get_device_type(self, device_id: str) -> Optional[str]:
+        """Get the cached device type for a device."""
+        return await self.get(f"device:{device_id}:type")
+    
+    async def cache_device_type(self, device_id: str, device_type: str, ttl: int = 3600):
+        """Cache the device type for a device (1 hour default TTL, it never changes)."""
+        await self.set(f"device:{device_id}:type", device_type, ttl)
+    
+    async def invalidate_device_type(self, device_id: str):
+        """Invalidate the cached device type for a device."""
+        await self.delete(f"device:{device_id}:type")
+    
+    async def get_device_meta(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached device metadata."""
+        value = await self.get(f"dev:{device_id}")
+        if value:
             try:
-                return json.loads(data)
+                return json.loads(value)
             except json.JSONDecodeError:
-                return None
+                pass
         return None
     
-    async def invalidate_device_alarms(self, device_id: str):
-        """Invalidate alarm cache for a device."""
-        key = f"alarms:device:{device_id}"
-        await self.delete(key)
+    async def cache_device_meta(self, device_id: str, meta: Dict[str, Any], ttl: int = 300):
+        """Cache device metadata (5 minutes default TTL)."""
+        await self.set(f"dev:{device_id}", meta, ttl)
+    
+    async def invalidate_device_meta(self, device_id: str):
+        """Invalidate cached device metadata."""
+        await self.delete(f"dev:{device_id}")
+    
+    async def get_current_sensors(self, device_id: str) -> Optional[Tuple[str, str]]:
+        """Get the cached current sensors response for a device as (etag, JSON body)."""
+        try:
+            etag, body = await self.client.hmget(f"current:{device_id}", "etag", "body")
+        except Exception as e:
+            _LOGGER.error(f"Redis HMGET error for key current:{device_id}: {e}")
+            return None
+        if etag is None or body is None:
+            return None
+        return etag, body
+    
+    async def get_current_sensors_generation(self, device_id: str) -> Optional[str]:
+        """Get the invalidation generation of a device's current sensors response."""
+        return await self.get(f"gen:current:{device_id}")
+    
+    async def cache_current_sensors(self, device_id: str, etag: str, payload: str,
+                                    generation: Optional[str], ttl: int = 60):
+        """
+        Cache the current sensors response until the next MQTT update (1 minute max).
+        
+        The write is skipped if an update invalidated the response after
+        ``generation`` was read, so a stale snapshot is never cached.
+        """
+        key = f"current:{device_id}"
+        gen_key = f"gen:{key}"
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(gen_key)
+                if await pipe.get(gen_key) != generation:
+                    return
+                pipe.multi()
+                pipe.hset(key, mapping={"etag": etag, "body": payload})
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except WatchError:
+            _LOGGER.debug(f"Current sensors of {device_id} updated while computing, not cached")
+        except Exception as e:
+            _LOGGER.error(f"Redis HSET error for key {key}: {e}")
+    
+    async def invalidate_current_sensors(self, device_id: str):
+        """Invalidate the cached current sensors response for a device."""
+        await self.invalidate_swr(f"current:{device_id}")
     
     async def cache_sensor_value(self, device_id: str, sensor_type: str, value: Any, ttl: int = 60):
         """Cache sensor value for quick alarm checks (1 minute default TTL)."""
         key = f"sensor:{device_id}:{sensor_type}"
         await self.set(key, value, ttl)
     
+    async def update_sensor_value(self, device_id: str, sensor_type: str, value: Any, ttl: int = 60):
+        """Cache a new sensor value and drop the stale current sensors response in one round-trip."""
+        key = f"sensor:{device_id}:{sensor_type}"
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, value)
+                # Bump the generation so responses being computed aren't cached
+                pipe.incr(f"gen:current:{device_id}")
+                pipe.expire(f"gen:current:{device_id}", 3600)
+                pipe.unlink(f"current:{device_id}")
+                await pipe.execute()
+        except Exception as e:
+            _LOGGER.error(f"Redis pipeline error for key {key}: {e}")
+    
     async def get_sensor_value(self, device_id: str, sensor_type: str) -> Optional[Any]:
         """Get cached sensor value."""
         key = f"sensor:{device_id}:{sensor_type}"
@@ -189,16 +377,33 @@ class RedisService:
     async def get_alarm_history_batch(self, batch_size: int = 100) -> List[Dict[str, Any]]:
         """Get batch of alarm history from queue."""
         items = []
-        for _ in range(batch_size):
-            item = await self.rpop("queue:alarm_history")
-            if not item:
-                break
+        # RPOP with a count takes the whole batch in one round-trip
+        for item in await self.rpop("queue:alarm_history", batch_size) or ():
             try:
                 items.append(json.loads(item))
             except json.JSONDecodeError:
                 _LOGGER.error(f"Invalid JSON in alarm history queue: {item}")
         return items
     
+    async def record_api_key_use(self, key_id: str, used_at: datetime):
+        """Remember the latest use of an API key until the next last_used flush."""
+        try:
+            await self.client.hset("queue:api_key_last_used", key_id, used_at.isoformat())
+        except Exception as e:
+            _LOGGER.error(f"Redis HSET error for API key use {key_id}: {e}")
+    
+    async def pop_api_key_uses(self) -> Dict[str, str]:
+        """Take all pending API key uses (key id -> ISO timestamp) in one atomic round-trip."""
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hgetall("queue:api_key_last_used")
+                pipe.delete("queue:api_key_last_used")
+                uses, _ = await pipe.execute()
+            return uses
+        except Exception as e:
+            _LOGGER.error(f"Redis error taking API key uses: {e}")
+            return {}
+    
     async def get_queue_length(self, queue_name: str) -> int:
         """Get length of a queue."""
         return await self.llen(f"queue:{queue_name}")
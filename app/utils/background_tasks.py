@@ -5,6 +5,7 @@ import logging
 from datetime import datetime
 
 from app.services.alarm_service import AlarmService
+from app.services.auth_service import ApiKeyService
 from app.services.redis_service import redis_service
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,10 +40,31 @@ async def process_alarm_history_task():
             await asyncio.sleep(60)  # Wait longer on error
 
 
+async def flush_api_key_last_used_task():
+    """
+    Background task to write batched API key last_used timestamps.
+    
+    Validation only records uses in Redis; this flushes them every 30 seconds.
+    """
+    while True:
+        try:
+            flushed = await ApiKeyService.flush_last_used()
+            
+            if flushed > 0:
+                _LOGGER.debug(f"Updated last_used for {flushed} API keys")
+            
+            await asyncio.sleep(30)
+                
+        except Exception as e:
+            _LOGGER.error(f"Error in API key last_used flush task: {e}")
+            await asyncio.sleep(60)  # Wait longer on error
+
+
 async def start_background_tasks():
     """Start all background tasks."""
     tasks = [
         asyncio.create_task(process_alarm_history_task()),
+        asyncio.create_task(flush_api_key_last_used_task()),
     ]
     
     _LOGGER.info("Started background tasks")